@@ -1,6 +1,95 @@
+from datetime import date
 from django.contrib import admin
+from django.contrib import messages
+from django.db.models import Max, Min
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.formats import date_format
 from django.utils.html import format_html
-from .models import Employee, Attendance, LeaveRequest, Salary, Developer
+from .models import Employee, Attendance, ArchivedAttendance, Holiday, Job, LeaveRequest, LeaveBalance, Salary, Shift, Developer
+from .cache import get_departments
+from .forms import EmployeeImportForm, LeaveRequestAdminForm
+from .images import variant_url
+from .importer import import_employees, read_rows
+from .pagination import EstimatedCountPaginator
+from . import jobs
+from .search import search_employees, search_leaves
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    # Changelist untuk tabel yang bisa mencapai jutaan baris: tanpa COUNT(*) penuh (jumlah
+    # diperkirakan, lihat pagination.py) dan foreign key memakai autocomplete, bukan dropdown semua baris
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        # Nama/ID karyawan dicari lewat indeks teks penuh, lalu disaring dengan employee_id yang berindeks
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(employee__in=search_employees(Employee.objects.all(), search_term)), False
+
+
+class DepartmentFilter(admin.SimpleListFilter):
+    # Pilihan diambil dari cache departemen, bukan SELECT DISTINCT lewat join ke tabel besar
+    title = 'Departemen'
+    parameter_name = 'department'
+
+    def lookups(self, request, model_admin):
+        return [(department, department) for department in get_departments()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(employee__department=self.value())
+        return queryset
+
+
+class MonthFilter(admin.SimpleListFilter):
+    # Pengganti date_hierarchy: DISTINCT per tahun/bulan memindai seluruh tabel, sedangkan
+    # rentang bulan cukup diambil dari MIN/MAX kolom berindeks
+    title = 'Bulan'
+    parameter_name = 'month'
+    field_name = 'date'
+
+    def lookups(self, request, model_admin):
+        # MIN dan MAX diambil terpisah; SQLite hanya memakai index jika agregatnya tunggal
+        queryset = model_admin.get_queryset(request)
+        first = queryset.aggregate(value=Min(self.field_name))['value']
+        if first is None:
+            return []
+        last = queryset.aggregate(value=Max(self.field_name))['value']
+        first, last = first.year * 12 + first.month - 1, last.year * 12 + last.month - 1
+        months = [date(index // 12, index % 12 + 1, 1) for index in range(last, first - 1, -1)]
+        return [(f'{month:%Y-%m}', date_format(month, 'YEAR_MONTH_FORMAT')) for month in months]
+
+    def queryset(self, request, queryset):
+        try:
+            month = date.fromisoformat(f'{self.value()}-01')
+        except (TypeError, ValueError):
+            return queryset
+        index = month.year * 12 + month.month
+        next_month = date(index // 12, index % 12 + 1, 1)
+        return queryset.filter(**{f'{self.field_name}__gte': month, f'{self.field_name}__lt': next_month})
+
+
+class SalaryMonthFilter(MonthFilter):
+    field_name = 'month'
+
+
+class LatenessFilter(admin.SimpleListFilter):
+    # Memakai kolom late_minutes yang disimpan saat absen (indeks parsial att_late_idx)
+    title = 'Keterlambatan'
+    parameter_name = 'late'
+
+    def lookups(self, request, model_admin):
+        return [('0', 'Terlambat'), ('15', 'Lebih dari 15 menit'), ('60', 'Lebih dari 1 jam')]
+
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '15', '60'):
+            return queryset.filter(late_minutes__gt=int(self.value()))
+        return queryset
+
 
 @admin.register(Developer)
 class DeveloperAdmin(admin.ModelAdmin):
@@ -17,7 +106,7 @@ class DeveloperAdmin(admin.ModelAdmin):
     # Method untuk menampilkan foto kecil di daftar admin
     def show_photo(self, obj):
         if obj.image:
-            return format_html('<img src="{}" style="width: 45px; height: 45px; border-radius: 50%; object-fit: cover;" />', obj.image.url)
+            return format_html('<img src="{}" style="width: 45px; height: 45px; border-radius: 50%; object-fit: cover;" />', variant_url(obj.image, obj.image_variants, 45))
         return "No Photo"
     show_photo.short_description = 'Foto'
 
@@ -32,19 +121,27 @@ class DeveloperAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
-    list_display = ['employee_id', 'full_name', 'position', 'department', 'salary', 'is_active', 'join_date']
-    list_filter = ['is_active', 'department', 'position', 'join_date']
+class EmployeeAdmin(LargeTableAdmin):
+    list_display = ['employee_id', 'full_name', 'position', 'department', 'shift', 'salary', 'is_active', 'join_date']
+    list_select_related = ['user', 'shift']
+    autocomplete_fields = ['user']
+    list_filter = ['is_active', 'department', 'position', 'shift', 'join_date']
     search_fields = ['employee_id', 'user__username', 'user__first_name', 'user__last_name', 'phone']
     list_editable = ['is_active']
     readonly_fields = ['created_at', 'updated_at']
+    actions = ['generate_payroll']
+    change_list_template = 'admin/employees/employee/change_list.html'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Memakai indeks teks penuh (search.py) alih-alih LIKE '%...%' di setiap kolom search_fields
+        return search_employees(queryset, search_term), False
     
     fieldsets = (
         ('Informasi User', {
             'fields': ('user',)
         }),
         ('Informasi Karyawan', {
-            'fields': ('employee_id', 'position', 'department', 'salary', 'join_date', 'photo')
+            'fields': ('employee_id', 'position', 'department', 'shift', 'salary', 'join_date', 'photo')
         }),
         ('Kontak', {
             'fields': ('phone', 'address')
@@ -54,25 +151,97 @@ class EmployeeAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.action(description='Buat gaji bulan ini untuk karyawan terpilih')
+    def generate_payroll(self, request, queryset):
+        # Dijalankan worker (run_workers); progres dan hasilnya terlihat di halaman status tugas
+        month = timezone.localdate().replace(day=1)
+        job = jobs.enqueue(
+            'payroll.run', user=request.user, month=month.isoformat(),
+            employee_ids=list(queryset.values_list('pk', flat=True)),
+        )
+        self.message_user(
+            request,
+            format_html(
+                'Payroll {} untuk {} karyawan dijadwalkan sebagai <a href="{}">tugas #{}</a>.',
+                f'{month:%B %Y}', len(job.kwargs['employee_ids']), reverse('job_list'), job.pk,
+            ),
+            messages.SUCCESS,
+        )
+
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='employees_employee_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:employees_employee_changelist')
+        result = None
+        form = EmployeeImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                rows = read_rows(form.cleaned_data['file'])
+            except (UnicodeDecodeError, ValueError) as exc:
+                form.add_error('file', f'File tidak bisa dibaca: {exc}')
+            else:
+                result = import_employees(rows)
+                self.message_user(request, f"{result['created']} karyawan berhasil diimpor.", messages.SUCCESS)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Impor Karyawan',
+            'form': form,
+            'result': result,
+        }
+        return render(request, 'admin/employees/employee/import.html', context)
+
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(LargeTableAdmin):
     list_display = ['employee', 'date', 'check_in', 'check_out', 'status', 'late_indicator']
-    list_filter = ['status', 'date', 'employee__department']
+    list_filter = ['status', LatenessFilter, MonthFilter, 'date', DepartmentFilter]
+    list_select_related = ['employee__user']
+    # Urut per karyawan memaksa join dan sort seluruh tabel
+    sortable_by = ['date', 'check_in', 'check_out', 'status', 'late_indicator']
+    autocomplete_fields = ['employee']
     search_fields = ['employee__user__first_name', 'employee__user__last_name', 'employee__employee_id']
-    date_hierarchy = 'date'
+    # Status hadir/terlambat dan menitnya dihitung ulang dari shift setiap kali disimpan
+    readonly_fields = ['late_minutes']
     
+    @admin.display(description='Keterlambatan', ordering='late_minutes')
     def late_indicator(self, obj):
-        if obj.is_late:
-            return format_html('<span style="color: red;">⚠ Terlambat</span>')
+        if obj.late_minutes:
+            return format_html('<span style="color: red;">⚠ Terlambat {} menit</span>', obj.late_minutes)
         return format_html('<span style="color: green;">✓ Tepat Waktu</span>')
-    late_indicator.short_description = 'Keterlambatan'
+
+@admin.register(ArchivedAttendance)
+class ArchivedAttendanceAdmin(LargeTableAdmin):
+    # Arsip hanya untuk dibaca; data dipindahkan lewat perintah archive_attendance
+    list_display = ['employee', 'date', 'check_in', 'check_out', 'status', 'late_minutes', 'archived_at']
+    list_filter = ['status', LatenessFilter, MonthFilter, 'date', DepartmentFilter]
+    list_select_related = ['employee__user']
+    # Urut per karyawan memaksa join dan sort seluruh tabel
+    sortable_by = ['date', 'check_in', 'check_out', 'status', 'late_minutes']
+    search_fields = ['employee__user__first_name', 'employee__user__last_name', 'employee__employee_id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 @admin.register(LeaveRequest)
-class LeaveRequestAdmin(admin.ModelAdmin):
+class LeaveRequestAdmin(LargeTableAdmin):
+    form = LeaveRequestAdminForm
     list_display = ['employee', 'leave_type', 'start_date', 'end_date', 'duration_days', 'status', 'created_at']
+    list_select_related = ['employee__user']
+    autocomplete_fields = ['employee', 'approved_by']
     list_filter = ['status', 'leave_type', 'start_date']
     search_fields = ['employee__user__first_name', 'employee__user__last_name', 'reason']
     readonly_fields = ['created_at', 'updated_at']
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_leaves(queryset, search_term), False
     
     fieldsets = (
         ('Informasi Karyawan', {
@@ -89,10 +258,50 @@ class LeaveRequestAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(LeaveBalance)
+class LeaveBalanceAdmin(LargeTableAdmin):
+    list_display = ['employee', 'year', 'leave_type', 'entitlement', 'used', 'remaining']
+    list_select_related = ['employee__user']
+    autocomplete_fields = ['employee']
+    list_filter = ['year', 'leave_type']
+    search_fields = ['employee__employee_id', 'employee__user__first_name', 'employee__user__last_name']
+    readonly_fields = ['used', 'updated_at']
+
 @admin.register(Salary)
-class SalaryAdmin(admin.ModelAdmin):
+class SalaryAdmin(LargeTableAdmin):
     list_display = ['employee', 'month', 'basic_salary', 'allowance', 'bonus', 'deduction', 'total_salary', 'payment_date']
-    list_filter = ['month', 'payment_date']
+    list_select_related = ['employee__user']
+    autocomplete_fields = ['employee']
+    list_filter = [SalaryMonthFilter, 'payment_date']
     search_fields = ['employee__user__first_name', 'employee__user__last_name']
-    date_hierarchy = 'month'
-    readonly_fields = ['total_salary', 'created_at']
\ No newline at end of file
+    readonly_fields = ['total_salary', 'created_at']
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'status', 'progress', 'attempts', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status']
+    list_select_related = ['created_by']
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ['retry']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Ulangi tugas terpilih yang gagal')
+    def retry(self, request, queryset):
+        count = queryset.filter(status='failed').update(
+            status='queued', attempts=0, run_at=timezone.now(), finished_at=None, progress=0, message='',
+        )
+        self.message_user(request, f'{count} tugas dikembalikan ke antrean.', messages.SUCCESS)
+
+@admin.register(Shift)
+class ShiftAdmin(admin.ModelAdmin):
+    list_display = ['name', 'start_time', 'end_time', 'grace_minutes', 'weekdays', 'department', 'is_default']
+    list_filter = ['is_default']
+    search_fields = ['name', 'department']
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ['date', 'name']
+    list_filter = ['date']
+    search_fields = ['name']
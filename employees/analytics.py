@@ -0,0 +1,186 @@
+"""
+Analitik payroll dari tabel Salary dan Employee.department: total per departemen, selisih
+terhadap bulan sebelumnya, median/persentil gaji dan tren biaya per bulan. Pengelompokan,
+LAG dan peringkat dihitung di database (window function, didukung SQLite >= 3.25 dan PostgreSQL);
+Python hanya menyusun ulang hasilnya. Hasil di-cache per bulan dan kedaluwarsa saat baris Salary
+bulan-bulan yang terlibat atau data karyawan berubah (lihat signals.py dan payroll.py).
+"""
+import hashlib
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
+from django.db import connection
+from .cache import get_versions, month_version
+from .models import Employee, Salary
+from .rollups import month_start
+
+TREND_MONTHS = 12
+PERCENTILES = [25, 50, 75, 90]
+ANALYTICS_TIMEOUT = 24 * 60 * 60
+
+CENT = Decimal('0.01')
+
+
+def _money(value):
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _shift(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _tables():
+    qn = connection.ops.quote_name
+    return qn(Salary._meta.db_table), qn(Employee._meta.db_table)
+
+
+def monthly_totals(first, last):
+    """
+    Total, jumlah karyawan dan LAG bulan sebelumnya per (bulan, departemen), plus total
+    perusahaan per bulan lewat SUM() OVER. Satu query.
+    """
+    salary, employee = _tables()
+    sql = f"""
+        WITH monthly AS (
+            SELECT s.month AS month, e.department AS department,
+                   SUM(s.total_salary) AS total, COUNT(*) AS headcount
+            FROM {salary} s JOIN {employee} e ON e.id = s.employee_id
+            WHERE s.month >= %s AND s.month <= %s
+            GROUP BY s.month, e.department
+        )
+        SELECT month, department, total, headcount,
+               LAG(month) OVER (PARTITION BY department ORDER BY month) AS previous_month,
+               LAG(total) OVER (PARTITION BY department ORDER BY month) AS previous_total,
+               SUM(total) OVER (PARTITION BY month) AS company_total,
+               SUM(headcount) OVER (PARTITION BY month) AS company_headcount
+        FROM monthly
+        ORDER BY month, department
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [connection.ops.adapt_datefield_value(first), connection.ops.adapt_datefield_value(last)])
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _percentile_columns():
+    # Interpolasi linear seperti PERCENTILE_CONT, dengan aritmetika integer agar sama di SQLite dan
+    # PostgreSQL: posisi = p * (n - 1) / 100, baris rn = floor(posisi) dan rn + 1 diberi bobot pecahannya
+    columns = []
+    for p in PERCENTILES:
+        position = f"({p} * (n - 1))"
+        columns.append(
+            f"SUM(CASE WHEN rn = {position} / 100 THEN total * (100 - {position} %% 100) "
+            f"WHEN rn = {position} / 100 + 1 THEN total * ({position} %% 100) ELSE 0 END) / 100.0 AS p{p}"
+        )
+    return ', '.join(columns)
+
+
+def salary_percentiles(month):
+    """Median dan persentil total gaji bulan `month` per departemen; departemen None = seluruh perusahaan."""
+    salary, employee = _tables()
+    ranked = """
+        SELECT {key} AS department, s.total_salary AS total,
+               ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY s.total_salary) - 1 AS rn,
+               COUNT(*) OVER (PARTITION BY {key}) AS n
+        FROM {salary} s JOIN {employee} e ON e.id = s.employee_id
+        WHERE s.month = %s
+    """
+    sql = f"""
+        WITH ranked AS (
+            {ranked.format(key='e.department', salary=salary, employee=employee)}
+            UNION ALL
+            {ranked.format(key='NULL', salary=salary, employee=employee)}
+        )
+        SELECT department, AVG(total) AS average, {_percentile_columns()}
+        FROM ranked
+        GROUP BY department
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [connection.ops.adapt_datefield_value(month)] * 2)
+        columns = [col[0] for col in cursor.description]
+        return {row[0]: dict(zip(columns[1:], row[1:])) for row in cursor.fetchall()}
+
+
+def _change(total, previous):
+    if previous is None:
+        return None, None
+    delta = total - previous
+    return delta, (delta / previous * 100).quantize(Decimal('0.1')) if previous else None
+
+
+def compute_payroll_analytics(month):
+    month = month_start(month)
+    first = _shift(month, -TREND_MONTHS)
+    rows = monthly_totals(first, month)
+    stats = salary_percentiles(month)
+
+    trend, departments = {}, []
+    for row in rows:
+        row_month = _as_date(row['month'])
+        total = _money(row['total'])
+        # LAG memberi baris sebelumnya yang ada; selisih hanya dihitung jika itu benar bulan lalu
+        consecutive = row['previous_month'] is not None and _as_date(row['previous_month']) == _shift(row_month, -1)
+        previous = _money(row['previous_total']) if consecutive else None
+        trend.setdefault(row_month, {
+            'month': row_month,
+            'total': _money(row['company_total']),
+            'headcount': row['company_headcount'],
+            'departments': {},
+        })['departments'][row['department']] = total
+        if row_month == month:
+            delta, delta_pct = _change(total, previous)
+            departments.append({
+                'department': row['department'],
+                'total': total,
+                'headcount': row['headcount'],
+                'previous_total': previous,
+                'delta': delta,
+                'delta_pct': delta_pct,
+                **{key: _money(value) for key, value in stats.get(row['department'], {}).items()},
+            })
+
+    # Bulan pertama hanya dipakai sebagai pembanding untuk bulan kedua
+    months = []
+    previous = trend.get(first, {}).get('total')
+    for i in range(1, TREND_MONTHS + 1):
+        entry = trend.get(_shift(first, i)) or {'month': _shift(first, i), 'total': None, 'headcount': 0, 'departments': {}}
+        entry['cost_per_head'] = _money(entry['total'] / entry['headcount']) if entry['headcount'] else None
+        entry['delta'], entry['delta_pct'] = _change(entry['total'], previous) if entry['total'] is not None else (None, None)
+        previous = entry['total']
+        months.append(entry)
+
+    current = months[-1]
+    for row in departments:
+        row['share'] = (row['total'] / current['total'] * 100).quantize(Decimal('0.1')) if current['total'] else None
+    departments.sort(key=lambda row: row['total'], reverse=True)
+    return {
+        'month': month,
+        'summary': {
+            'total': current['total'],
+            'headcount': current['headcount'],
+            'delta': current['delta'],
+            'delta_pct': current['delta_pct'],
+            **{key: _money(value) for key, value in stats.get(None, {}).items()},
+        },
+        'departments': departments,
+        'trend': months,
+        'department_names': sorted({name for entry in months for name in entry['departments']}),
+    }
+
+
+def payroll_analytics(month):
+    """Analitik bulan `month` dari cache; kunci memuat versi Salary tiap bulan dalam jendela tren."""
+    month = month_start(month)
+    names = [month_version('salary', _shift(month, -i)) for i in range(TREND_MONTHS + 1)]
+    # 14 versi terlalu panjang untuk kunci memcached, jadi diringkas menjadi hash
+    versions = '.'.join(str(version) for version in get_versions('employee', *names))
+    key = f"payroll_analytics:{month:%Y-%m}:{hashlib.md5(versions.encode()).hexdigest()}"
+    return cache.get_or_set(key, lambda: compute_payroll_analytics(month), ANALYTICS_TIMEOUT)
+
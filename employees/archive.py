@@ -0,0 +1,107 @@
+"""
+Tier arsip kehadiran. Baris Attendance yang lebih tua dari horizon (ATTENDANCE_HOT_MONTHS bulan
+penuh sebelum bulan berjalan) dipindahkan ke tabel ArchivedAttendance, sehingga tabel aktif yang
+dipakai check-in pagi dan dashboard tetap kecil dari tahun ke tahun. Pembacaan riwayat, ekspor
+dan rekap memakai `sources()` agar data aktif dan arsip terbaca bersamaan.
+"""
+from datetime import date
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .cache import bump_version
+from .models import Attendance, ArchivedAttendance
+
+BATCH_SIZE = 2000
+COLUMNS = ['id', 'employee_id', 'date', 'check_in', 'check_out', 'status', 'late_minutes', 'notes', 'location', 'created_at']
+
+
+def archive_cutoff(today=None):
+    # Awal bulan, ATTENDANCE_HOT_MONTHS bulan sebelum bulan berjalan; dibulatkan ke awal bulan
+    # agar rekap bulanan dan payroll bulan-bulan terakhir selalu membaca tabel aktif saja
+    today = today or timezone.localdate()
+    index = today.year * 12 + today.month - 1 - settings.ATTENDANCE_HOT_MONTHS
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def sources(**filters):
+    """Queryset tabel aktif dan arsip dengan filter yang sama, untuk dibaca bersamaan."""
+    return [Attendance.objects.filter(**filters), ArchivedAttendance.objects.filter(**filters)]
+
+
+def _copy_sql(source, target, where):
+    ops = connection.ops
+    columns = ', '.join(ops.quote_name(c) for c in COLUMNS)
+    extra_columns, extra_values = ('', '')
+    if target is ArchivedAttendance:
+        extra_columns, extra_values = f", {ops.quote_name('archived_at')}", ', %s'
+    return (
+        f"INSERT INTO {ops.quote_name(target._meta.db_table)} ({columns}{extra_columns}) "
+        f"SELECT {columns}{extra_values} FROM {ops.quote_name(source._meta.db_table)} WHERE {where} "
+        f"ON CONFLICT ({ops.quote_name('employee_id')}, {ops.quote_name('date')}) DO NOTHING"
+    )
+
+
+def _move(source, target, ids):
+    """
+    Salin baris `ids` dari `source` ke `target` lalu hapus hanya yang benar-benar tersalin (id asli
+    dipertahankan). Baris yang bentrok dengan (employee, date) yang sudah ada di `target` dibiarkan
+    di `source`. Mengembalikan (jumlah dipindahkan, list id yang bentrok).
+    """
+    placeholders = ', '.join(['%s'] * len(ids))
+    params = list(ids)
+    if target is ArchivedAttendance:
+        params.insert(0, connection.ops.adapt_datetimefield_value(timezone.now()))
+    with connection.cursor() as cursor:
+        cursor.execute(_copy_sql(source, target, f"{connection.ops.quote_name('id')} IN ({placeholders})"), params)
+        copied = sorted(target.objects.filter(pk__in=ids).values_list('id', flat=True))
+        if copied:
+            # DELETE mentah: signal post_delete akan mengurangi rekap untuk baris yang hanya berpindah tabel
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(source._meta.db_table)} "
+                f"WHERE {connection.ops.quote_name('id')} IN ({', '.join(['%s'] * len(copied))})",
+                copied,
+            )
+    return len(copied), sorted(set(ids) - set(copied))
+
+
+def archive_attendance(before=None, batch_size=BATCH_SIZE):
+    """
+    Pindahkan baris Attendance dengan tanggal < `before` (default archive_cutoff()) ke arsip,
+    per batch dengan INSERT ... SELECT lalu DELETE dalam satu transaksi. Signal tidak dipicu,
+    sehingga rekap harian/bulanan tetap menghitung baris yang diarsipkan. Baris yang tanggalnya
+    sudah ada di arsip tidak dihapus dan dilaporkan sebagai konflik.
+    Mengembalikan dict berisi jumlah `moved` dan id `conflicts`.
+    """
+    before = before or archive_cutoff()
+    moved, conflicts, last_id = 0, [], 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Attendance.objects.filter(date__lt=before, id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            count, skipped = _move(Attendance, ArchivedAttendance, ids)
+        moved += count
+        conflicts += skipped
+        last_id = ids[-1]
+    if moved:
+        bump_version('attendance')
+    return {'moved': moved, 'conflicts': conflicts}
+
+
+def restore_attendance(since):
+    """
+    Kembalikan baris arsip dengan tanggal >= `since` ke tabel aktif (misalnya setelah horizon
+    diperbesar). Baris arsip yang tanggalnya sudah ada di tabel aktif tetap di arsip dan dilaporkan.
+    """
+    ids = list(ArchivedAttendance.objects.filter(date__gte=since).order_by('id').values_list('id', flat=True))
+    restored, conflicts = 0, []
+    for i in range(0, len(ids), BATCH_SIZE):
+        with transaction.atomic():
+            count, skipped = _move(ArchivedAttendance, Attendance, ids[i:i + BATCH_SIZE])
+        restored += count
+        conflicts += skipped
+    if restored:
+        bump_version('attendance')
+    return {'restored': restored, 'conflicts': conflicts}
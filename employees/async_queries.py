@@ -0,0 +1,24 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def _in_worker_thread(query):
+    # thread_sensitive=False: setiap query berjalan di thread (dan koneksi database) sendiri,
+    # sehingga benar-benar paralel, bukan antre di satu thread sinkron
+    def run():
+        try:
+            return query()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def gather_queries(queries):
+    """
+    Jalankan dict {nama: callable} query ORM sinkron yang saling independen secara bersamaan.
+    Setiap callable harus mengembalikan data yang sudah dievaluasi (list/dict), bukan QuerySet lazy.
+    """
+    names = list(queries)
+    results = await asyncio.gather(*(_in_worker_thread(queries[name])() for name in names))
+    return dict(zip(names, results))
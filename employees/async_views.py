@@ -0,0 +1,80 @@
+# Versi async dari view dashboard dan daftar karyawan untuk deployment ASGI.
+# Query yang saling independen dijalankan bersamaan lewat gather_queries; rendering tetap
+# dilakukan di thread sinkron karena template membaca request.user dan session secara lazy.
+# Aktifkan dengan ASYNC_VIEWS=1 (lihat employees/urls.py); WSGI tetap memakai views.py.
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import alogout
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Page, Paginator
+from django.shortcuts import redirect, render
+from .async_queries import gather_queries
+from .cache import get_departments
+from .dashboard import aadmin_dashboard_context
+from .views import EMPLOYEES_PER_PAGE, employee_dashboard_queries, employee_queryset
+
+arender = sync_to_async(render)
+
+
+@login_required
+async def employee_dashboard(request):
+    user = await request.auser()
+    if user.is_staff:
+        return redirect('admin_dashboard')
+
+    # Employee sudah ikut dimuat (JOIN) oleh IdentityBackend
+    employee = getattr(user, 'employee', None)
+    if employee is None:
+        messages.error(request, "Akun Anda belum terhubung data Karyawan. Silakan hubungi Admin.")
+        await alogout(request)
+        return redirect('login')
+
+    context = {
+        'title': 'Dashboard Karyawan',
+        'employee': employee,
+        **await gather_queries(employee_dashboard_queries(employee)),
+    }
+    return await arender(request, 'employees/employee_dashboard.html', context)
+
+
+@staff_member_required
+async def admin_dashboard(request):
+    context = {'title': 'Dashboard Admin', **await aadmin_dashboard_context()}
+    return await arender(request, 'employees/admin_dashboard.html', context)
+
+
+@staff_member_required
+async def employee_list(request):
+    employees = employee_queryset(request.GET)
+    paginator = Paginator(employees, EMPLOYEES_PER_PAGE)
+    # Nomor halaman divalidasi tanpa paginator.count agar COUNT tidak berjalan sinkron di sini
+    try:
+        number = max(int(request.GET.get('page') or 1), 1)
+    except ValueError:
+        number = 1
+
+    def page_rows(number):
+        offset = (number - 1) * EMPLOYEES_PER_PAGE
+        return lambda: list(employees[offset:offset + EMPLOYEES_PER_PAGE])
+
+    # COUNT, baris halaman dan daftar departemen diambil bersamaan
+    results = await gather_queries({
+        'count': employees.count,
+        'rows': page_rows(number),
+        'departments': get_departments,
+    })
+    paginator.count = results['count']
+    rows = results['rows']
+    if number > paginator.num_pages:
+        number = paginator.num_pages
+        rows = (await gather_queries({'rows': page_rows(number)}))['rows']
+    page_obj = Page(rows, number, paginator)
+
+    context = {
+        'title': 'Daftar Karyawan',
+        'employees': rows,
+        'page_obj': page_obj,
+        'departments': results['departments'],
+    }
+    return await arender(request, 'employees/employee_list.html', context)
@@ -0,0 +1,27 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .cache import get_identity
+
+
+class IdentityBackend(ModelBackend):
+    """
+    ModelBackend yang memuat User bersama Employee-nya dalam satu query JOIN,
+    sehingga request.user.employee tidak memicu query kedua. Hasilnya boleh
+    di-cache sebentar antar request (IDENTITY_CACHE_TIMEOUT).
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+
+        def load():
+            try:
+                return UserModel._default_manager.select_related('employee').get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+
+        user = get_identity(user_id, load)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
@@ -0,0 +1,77 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+DEPARTMENTS_CACHE_KEY = 'employees:departments'
+DEPARTMENTS_CACHE_TIMEOUT = 60 * 60
+
+IDENTITY_CACHE_KEY = 'employees:identity:{}'
+
+# Versi data per model. Setiap penulisan menaikkan versi sehingga semua entri cache
+# yang kuncinya memuat versi tersebut otomatis kedaluwarsa tanpa perlu dihapus satu per satu.
+VERSION_KEY = 'employees:version:{}'
+VERSIONED_MODELS = ['employee', 'attendance', 'leave', 'salary']
+
+
+def get_departments():
+    # Daftar departemen diambil sekali lewat DISTINCT (memakai index department) lalu di-cache.
+    # Cache dihapus oleh signal setiap kali data Employee berubah.
+    from .models import Employee
+    return cache.get_or_set(
+        DEPARTMENTS_CACHE_KEY,
+        lambda: list(Employee.objects.order_by('department').values_list('department', flat=True).distinct()),
+        DEPARTMENTS_CACHE_TIMEOUT,
+    )
+
+
+def clear_departments():
+    cache.delete(DEPARTMENTS_CACHE_KEY)
+
+
+def get_versions(*names):
+    keys = [VERSION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            # Nilai awal berbasis waktu agar versi lama tidak terpakai ulang setelah cache di-evict
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+def bump_version(name):
+    key = VERSION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def month_version(name, month):
+    # Versi per bulan (mis. salary:2026-03) untuk cache yang hanya bergantung pada bulan tertentu
+    return f'{name}:{month:%Y-%m}'
+
+
+def versioned_key(prefix, *names):
+    return f"{prefix}:" + '.'.join(str(v) for v in get_versions(*names))
+
+
+def get_identity(user_id, loader):
+    # User beserta Employee-nya (lihat backends.IdentityBackend), disimpan singkat antar request.
+    # Dihapus oleh signal saat User atau Employee disimpan/dihapus.
+    timeout = getattr(settings, 'IDENTITY_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return loader()
+    key = IDENTITY_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = loader()
+        if user is not None:
+            cache.set(key, user, timeout)
+    return user
+
+
+def clear_identity(user_id):
+    cache.delete(IDENTITY_CACHE_KEY.format(user_id))
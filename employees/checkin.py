@@ -0,0 +1,81 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from . import rollups, schedules
+from .cache import bump_version
+from .models import Attendance
+
+
+def decide_status(employee, day, check_in):
+    # (status, menit terlambat) menurut shift karyawan; konfigurasi shift dibaca dari cache
+    return schedules.evaluate(employee, day, check_in)
+
+
+def _insert_sql():
+    table = connection.ops.quote_name(Attendance._meta.db_table)
+    columns = ['employee_id', 'date', 'check_in', 'status', 'late_minutes', 'notes', 'location', 'created_at']
+    return (
+        f"INSERT INTO {table} ({', '.join(connection.ops.quote_name(c) for c in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({connection.ops.quote_name('employee_id')}, {connection.ops.quote_name('date')}) DO NOTHING"
+    )
+
+
+def check_in(employee, location='', notes='', now=None):
+    """
+    Catat check-in hari ini dengan satu INSERT ... ON CONFLICT DO NOTHING, sehingga
+    ratusan check-in bersamaan tidak saling menimpa dan tidak perlu baca-lalu-tulis.
+    Jam masuk, status (present/late) dan menit terlambat ditentukan di server saat penulisan.
+    Tanggal baris adalah tanggal shift, jadi check-in shift malam lewat tengah malam tetap
+    masuk baris malam sebelumnya. Mengembalikan (attendance, created).
+    """
+    now = timezone.localtime(now)
+    day, moment = schedules.attendance_date(employee, now), now.time().replace(microsecond=0)
+    status, late_minutes = decide_status(employee, day, moment)
+    ops = connection.ops
+    params = [
+        employee.pk, ops.adapt_datefield_value(day), ops.adapt_timefield_value(moment), status, late_minutes,
+        notes, location, ops.adapt_datetimefield_value(timezone.now()),
+    ]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_insert_sql(), params)
+            created = cursor.rowcount == 1
+        if created:
+            # INSERT mentah tidak memicu signal, jadi rekap diperbarui langsung
+            rollups.apply(employee.pk, day, status, 1)
+
+    if created:
+        bump_version('attendance')
+        attendance = Attendance(
+            employee=employee, date=day, check_in=moment, status=status, late_minutes=late_minutes,
+            notes=notes, location=location,
+        )
+        return attendance, True
+
+    attendance = Attendance.objects.get(employee=employee, date=day)
+    if attendance.check_in is None:
+        # Baris sudah dibuat sebelumnya tanpa jam masuk (misalnya oleh admin): isi lewat ORM
+        attendance.check_in = moment
+        attendance.status, attendance.late_minutes = status, late_minutes
+        attendance.notes = notes or attendance.notes
+        attendance.location = location or attendance.location
+        attendance.save()
+        return attendance, True
+    return attendance, False
+
+
+def check_out(employee, now=None):
+    """
+    Satu UPDATE bersyarat; hanya berlaku bila sudah check-in dan belum check-out.
+    Baris dicari dengan tanggal shift, sehingga check-out shift malam keesokan paginya ditemukan.
+    Mengembalikan jam keluar yang dicatat, atau None bila tidak ada baris yang diperbarui.
+    """
+    now = timezone.localtime(now)
+    day, moment = schedules.attendance_date(employee, now), now.time().replace(microsecond=0)
+    updated = Attendance.objects.filter(
+        employee=employee, date=day, check_in__isnull=False, check_out__isnull=True,
+    ).update(check_out=moment)
+    if not updated:
+        return None
+    bump_version('attendance')
+    return moment
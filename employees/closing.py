@@ -0,0 +1,109 @@
+"""
+Tutup hari kehadiran. Baris Attendance hanya dibuat saat karyawan absen masuk, sehingga hari
+tanpa absensi tidak tercatat sama sekali. Penutupan harian mengisi baris yang hilang untuk semua
+karyawan aktif yang hari itu hari kerja menurut shift-nya (lihat schedules.py) dengan satu
+INSERT ... SELECT: 'sick'/'permission' bila hari itu tercakup izin yang disetujui, selain itu
+'absent'. Hari libur dilewati. Aman dijalankan berulang untuk rentang yang sama.
+"""
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from . import rollups, schedules
+from .models import Attendance, ArchivedAttendance, Employee, LeaveRequest
+
+AUTO_NOTE = 'Dicatat otomatis saat tutup hari'
+BATCH_DAYS = 31
+
+
+def calendar_days(start, end):
+    # Hari libur perusahaan dilewati; akhir pekan ditentukan per shift di dalam query
+    holidays = schedules.holidays()
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+    return [day for day in days if day not in holidays]
+
+
+def _tables():
+    qn = connection.ops.quote_name
+    return (
+        qn(Attendance._meta.db_table), qn(ArchivedAttendance._meta.db_table),
+        qn(Employee._meta.db_table), qn(LeaveRequest._meta.db_table),
+    )
+
+
+def _days_cte(days):
+    # Daftar (tanggal, hari ke-1..7 mulai Senin) sebagai CTE agar seluruh rentang diproses dalam satu statement
+    placeholder = 'CAST(%s AS date)' if connection.vendor == 'postgresql' else '%s'
+    values = ', '.join(f'({placeholder}, %s)' for _ in days)
+    params = [value for day in days for value in (connection.ops.adapt_datefield_value(day), day.isoweekday())]
+    return f"days (day, weekday) AS (VALUES {values})", params
+
+
+def _leave_status(employee, day):
+    # Status dari izin yang disetujui dan mencakup `day`; izin sakit didahulukan
+    leave = _tables()[3]
+    covering = (
+        f"SELECT 1 FROM {leave} l WHERE l.employee_id = {employee} AND l.status = %s "
+        f"AND l.start_date <= {day} AND l.end_date >= {day}"
+    )
+    sql = (
+        f"CASE WHEN EXISTS ({covering} AND l.leave_type = %s) THEN %s "
+        f"WHEN EXISTS ({covering}) THEN %s ELSE %s END"
+    )
+    return sql, ['approved', 'sick', 'sick', 'approved', 'permission', 'absent']
+
+
+def _insert_missing(days, now):
+    attendance, archived, employee, _ = _tables()
+    cte, cte_params = _days_cte(days)
+    status, status_params = _leave_status('e.id', 'd.day')
+    weekdays, weekdays_params = schedules.weekdays_sql('e')
+    sql = (
+        f"INSERT INTO {attendance} (employee_id, date, status, late_minutes, notes, location, created_at) "
+        f"WITH {cte} "
+        f"SELECT e.id, d.day, {status}, 0, %s, '', %s "
+        f"FROM days d CROSS JOIN {employee} e "
+        f"WHERE e.is_active = %s AND e.join_date <= d.day AND SUBSTR({weekdays}, d.weekday, 1) = '1' "
+        f"AND NOT EXISTS (SELECT 1 FROM {attendance} a WHERE a.employee_id = e.id AND a.date = d.day) "
+        f"AND NOT EXISTS (SELECT 1 FROM {archived} a WHERE a.employee_id = e.id AND a.date = d.day) "
+        f"ON CONFLICT (employee_id, date) DO NOTHING"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*cte_params, *status_params, AUTO_NOTE, now, True, *weekdays_params])
+        return cursor.rowcount
+
+
+def _apply_late_leave(days):
+    # Izin yang disetujui setelah hari ditutup: ubah baris 'absent' tanpa jam masuk menjadi izin/sakit
+    attendance = _tables()[0]
+    status, status_params = _leave_status(f'{attendance}.employee_id', f'{attendance}.date')
+    placeholders = ', '.join(['%s'] * len(days))
+    sql = (
+        f"UPDATE {attendance} SET status = {status} "
+        f"WHERE {attendance}.date IN ({placeholders}) AND {attendance}.status = %s "
+        f"AND {attendance}.check_in IS NULL AND ({status}) <> %s"
+    )
+    dates = [connection.ops.adapt_datefield_value(day) for day in days]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*status_params, *dates, 'absent', *status_params, 'absent'])
+        return cursor.rowcount
+
+
+def close_days(start, end=None):
+    """
+    Tutup hari dalam rentang [start, end] (default hanya `start`): isi baris kehadiran yang
+    hilang, selaraskan baris 'absent' dengan izin yang disetujui, lalu hitung ulang rekap rentang
+    tersebut (signal tidak dipicu oleh SQL massal). Mengembalikan jumlah baris dibuat/diubah.
+    """
+    end = end or start
+    days = calendar_days(start, end)
+    if not days:
+        return {'days': 0, 'created': 0, 'updated': 0}
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    created = updated = 0
+    for i in range(0, len(days), BATCH_DAYS):
+        with transaction.atomic():
+            created += _insert_missing(days[i:i + BATCH_DAYS], now)
+            updated += _apply_late_leave(days[i:i + BATCH_DAYS])
+    if created or updated:
+        rollups.rebuild(days[0], days[-1])
+    return {'days': len(days), 'created': created, 'updated': updated}
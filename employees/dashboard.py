@@ -0,0 +1,82 @@
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from . import rollups
+from .async_queries import gather_queries
+from .cache import VERSIONED_MODELS, versioned_key
+from .models import Employee, Attendance, AttendanceDailySummary, LeaveRequest, Salary
+
+ADMIN_DASHBOARD_TIMEOUT = 5 * 60
+
+
+def salary_total(current_month):
+    total = Salary.objects.filter(month=current_month).aggregate(total=Sum('total_salary'))['total']
+    return total or Decimal('0')
+
+
+def attendance_counters(today, current_month):
+    # Statistik hari ini dan bulan ini dari rekap harian dalam satu query
+    month = AttendanceDailySummary.objects.filter(date__gte=current_month).aggregate(
+        present_today=Sum('present', filter=Q(date=today)),
+        absent_today=Sum('absent', filter=Q(date=today)),
+        **{status: Sum(status) for status in rollups.STATUSES},
+    )
+    return {
+        'present_today': month.pop('present_today') or 0,
+        'absent_today': month.pop('absent_today') or 0,
+        'attendance_stats': {status: value or 0 for status, value in month.items()},
+    }
+
+
+def admin_context_queries(today, current_month):
+    # Query-query yang saling independen; view async menjalankannya bersamaan
+    return {
+        'total_employees': lambda: Employee.objects.filter(is_active=True).count(),
+        'total_salary': lambda: salary_total(current_month),
+        'attendance': lambda: attendance_counters(today, current_month),
+        # List Karyawan Terbaru
+        'recent_employees': lambda: list(Employee.objects.select_related('user').order_by('-join_date')[:5]),
+        # Absensi Terbaru
+        'recent_attendance': lambda: list(Attendance.objects.select_related('employee__user').order_by('-created_at')[:10]),
+        # Izin Pending
+        'leave_requests': lambda: list(LeaveRequest.objects.filter(status='pending').select_related('employee__user')),
+    }
+
+
+def merge_admin_results(results):
+    context = {**results.pop('attendance'), **results}
+    # Jumlah izin pending diambil dari daftar yang sudah dimuat, tanpa query COUNT terpisah
+    context['pending_leaves'] = len(context['leave_requests'])
+    return context
+
+
+def build_admin_context(today, current_month):
+    queries = admin_context_queries(today, current_month)
+    return merge_admin_results({name: query() for name, query in queries.items()})
+
+
+async def abuild_admin_context(today, current_month):
+    return merge_admin_results(await gather_queries(admin_context_queries(today, current_month)))
+
+
+def admin_dashboard_key(today):
+    return versioned_key(f'employees:admin-dashboard:{today}', *VERSIONED_MODELS)
+
+
+def admin_dashboard_context():
+    today = timezone.localdate()
+    current_month = today.replace(day=1)
+    return cache.get_or_set(admin_dashboard_key(today), lambda: build_admin_context(today, current_month), ADMIN_DASHBOARD_TIMEOUT)
+
+
+async def aadmin_dashboard_context():
+    today = timezone.localdate()
+    current_month = today.replace(day=1)
+    key = await sync_to_async(admin_dashboard_key)(today)
+    context = await cache.aget(key)
+    if context is None:
+        context = await abuild_admin_context(today, current_month)
+        await cache.aset(key, context, ADMIN_DASHBOARD_TIMEOUT)
+    return context
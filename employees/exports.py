@@ -0,0 +1,144 @@
+import csv
+from datetime import datetime
+from django.http import Http404
+from django.utils import timezone
+from .models import Attendance, ArchivedAttendance, LeaveRequest, Salary
+
+CHUNK_SIZE = 2000
+# Teks yang diawali karakter ini dibaca Excel/LibreOffice sebagai formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EMPLOYEE_COLUMNS = [
+    ('ID Karyawan', 'employee__employee_id'),
+    ('Nama Depan', 'employee__user__first_name'),
+    ('Nama Belakang', 'employee__user__last_name'),
+    ('Departemen', 'employee__department'),
+]
+
+# Definisi dataset ekspor: model, kolom tanggal untuk filter rentang (end_field bila baris punya
+# rentang sendiri; baris yang beririsan dengan rentang ekspor ikut), dan kolom (judul, lookup)
+DATASETS = {
+    'attendance': {
+        'model': Attendance,
+        # Baris lama dibaca dari tabel arsip lebih dulu, lalu tabel aktif
+        'archive': ArchivedAttendance,
+        'date_field': 'date',
+        'columns': EMPLOYEE_COLUMNS + [
+            ('Tanggal', 'date'),
+            ('Jam Masuk', 'check_in'),
+            ('Jam Keluar', 'check_out'),
+            ('Status', 'status'),
+            ('Menit Terlambat', 'late_minutes'),
+            ('Lokasi', 'location'),
+            ('Catatan', 'notes'),
+        ],
+    },
+    'leave': {
+        'model': LeaveRequest,
+        'date_field': 'start_date',
+        'end_field': 'end_date',
+        'columns': EMPLOYEE_COLUMNS + [
+            ('Jenis Izin', 'leave_type'),
+            ('Tanggal Mulai', 'start_date'),
+            ('Tanggal Selesai', 'end_date'),
+            ('Status', 'status'),
+            ('Alasan', 'reason'),
+            ('Disetujui Oleh', 'approved_by__username'),
+            ('Dibuat', 'created_at'),
+        ],
+    },
+    'salary': {
+        'model': Salary,
+        'date_field': 'month',
+        'columns': EMPLOYEE_COLUMNS + [
+            ('Bulan', 'month'),
+            ('Gaji Pokok', 'basic_salary'),
+            ('Tunjangan', 'allowance'),
+            ('Bonus', 'bonus'),
+            ('Potongan', 'deduction'),
+            ('Total Gaji', 'total_salary'),
+            ('Tanggal Pembayaran', 'payment_date'),
+        ],
+    },
+}
+
+
+def get_dataset(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise Http404(f'Dataset ekspor tidak dikenal: {name}')
+
+
+def headers(name):
+    return [header for header, _ in get_dataset(name)['columns']]
+
+
+def export_rows(name, start=None, end=None):
+    """
+    Iterasi baris (tuple) dataset secara bertahap. values_list() menghasilkan satu query JOIN
+    dan iterator() membaca per chunk (server-side cursor di PostgreSQL), jadi memori tetap datar.
+    """
+    dataset = get_dataset(name)
+    date_field = dataset['date_field']
+    lookups = [lookup for _, lookup in dataset['columns']]
+    for queryset in _querysets(dataset, start, end):
+        yield from queryset.order_by(date_field, 'id').values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _querysets(dataset, start, end):
+    date_field = dataset['date_field']
+    models = [dataset['archive'], dataset['model']] if 'archive' in dataset else [dataset['model']]
+    for model in models:
+        queryset = model.objects.all()
+        if start is not None:
+            queryset = queryset.filter(**{f"{dataset.get('end_field', date_field)}__gte": start})
+        if end is not None:
+            queryset = queryset.filter(**{f'{date_field}__lte': end})
+        yield queryset
+
+
+def count_rows(name, start=None, end=None):
+    # Untuk progres ekspor di latar (jobs.py); ekspor langsung tidak menghitung lebih dulu
+    return sum(queryset.count() for queryset in _querysets(get_dataset(name), start, end))
+
+
+class Echo:
+    # Objek mirip file untuk csv.writer yang langsung mengembalikan baris hasil tulis
+    def write(self, value):
+        return value
+
+
+def stream_csv(name, start=None, end=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers(name))
+    for row in export_rows(name, start, end):
+        yield writer.writerow([safe_text(value) for value in row])
+
+
+def write_xlsx(name, output, start=None, end=None, progress=None):
+    # openpyxl opsional; mode write_only menulis baris langsung ke file tanpa menyimpan semua di memori
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=name)
+    sheet.append(headers(name))
+    for number, row in enumerate(export_rows(name, start, end), start=1):
+        sheet.append([excel_value(value) for value in row])
+        if progress and number % CHUNK_SIZE == 0:
+            progress(number)
+    workbook.save(output)
+
+
+def safe_text(value):
+    # Awali teks bebas (alasan, catatan, nama) yang mirip formula dengan ' agar tampil sebagai teks
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def excel_value(value):
+    # Excel tidak mendukung datetime ber-timezone
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return safe_text(value)
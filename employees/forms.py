@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from .leaves import ACTIVE_LEAVE_STATUSES, exceeds_quota, lock_balances, overlapping_leaves
 from .models import Employee, LeaveRequest, Attendance
 
 class EmployeeRegistrationForm(UserCreationForm):
@@ -27,6 +28,14 @@ class EmployeeProfileForm(forms.ModelForm):
             'photo': forms.FileInput(attrs={'class': 'form-control'}),
         }
 
+def check_overlap(employee, start_date, end_date, instance):
+    overlap = overlapping_leaves(employee, start_date, end_date, exclude_pk=instance.pk).first()
+    if overlap:
+        raise forms.ValidationError(
+            f'Tanggal bertabrakan dengan izin {overlap.get_leave_type_display()} '
+            f'({overlap.start_date:%d/%m/%Y} - {overlap.end_date:%d/%m/%Y}, {overlap.get_status_display()}).'
+        )
+
 class LeaveRequestForm(forms.ModelForm):
     class Meta:
         model = LeaveRequest
@@ -39,6 +48,10 @@ class LeaveRequestForm(forms.ModelForm):
             'attachment': forms.FileInput(attrs={'class': 'form-control'}),
         }
     
+    def __init__(self, *args, employee=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.employee = employee
+
     def clean(self):
         cleaned_data = super().clean()
         start_date = cleaned_data.get('start_date')
@@ -46,9 +59,51 @@ class LeaveRequestForm(forms.ModelForm):
         
         if start_date and end_date and start_date > end_date:
             raise forms.ValidationError('Tanggal selesai harus setelah tanggal mulai!')
+
+        if self.employee and start_date and end_date:
+            check_overlap(self.employee, start_date, end_date, self.instance)
+
+            leave_type = cleaned_data.get('leave_type')
+            over = leave_type and exceeds_quota(self.employee, leave_type, start_date, end_date, exclude=self.instance)
+            if over:
+                year, remaining = over
+                raise forms.ValidationError(f'Sisa jatah izin ini untuk tahun {year} tinggal {max(remaining, 0)} hari.')
         
         return cleaned_data
 
+class LeaveRequestAdminForm(forms.ModelForm):
+    """
+    Form admin LeaveRequest dengan aturan yang sama seperti manage_leave: izin aktif tidak boleh
+    bertabrakan, dan izin yang disetujui tidak boleh melebihi sisa jatah. Saldo dikunci selama
+    transaksi admin sehingga dua persetujuan bersamaan tidak sama-sama lolos.
+    """
+    class Meta:
+        model = LeaveRequest
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        employee = cleaned_data.get('employee')
+        leave_type = cleaned_data.get('leave_type')
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        status = cleaned_data.get('status')
+        if not (employee and start_date and end_date):
+            return cleaned_data
+        if start_date > end_date:
+            raise forms.ValidationError('Tanggal selesai harus setelah tanggal mulai!')
+
+        if status in ACTIVE_LEAVE_STATUSES:
+            check_overlap(employee, start_date, end_date, self.instance)
+        if status == 'approved' and leave_type:
+            lock_balances(employee, leave_type, start_date, end_date)
+            # self.instance masih berisi nilai lama di sini; izin yang sudah disetujui tidak dihitung dua kali
+            over = exceeds_quota(employee, leave_type, start_date, end_date, exclude=self.instance)
+            if over:
+                year, remaining = over
+                raise forms.ValidationError(f'Izin tidak dapat disetujui: sisa jatah tahun {year} tinggal {max(remaining, 0)} hari.')
+        return cleaned_data
+
 class AttendanceForm(forms.ModelForm):
     class Meta:
         model = Attendance
@@ -56,4 +111,10 @@ class AttendanceForm(forms.ModelForm):
         widgets = {
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 2, 'placeholder': 'Catatan (opsional)'}),
             'location': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Lokasi (opsional)'}),
-        }
\ No newline at end of file
+        }
+
+class EmployeeImportForm(forms.Form):
+    file = forms.FileField(
+        label='File CSV/JSON',
+        help_text='Kolom: username, email, first_name, last_name, password, phone, address, position, department, salary, join_date',
+    )
@@ -0,0 +1,89 @@
+import hashlib
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from . import jobs
+
+# Semua foto ditampilkan bulat/persegi (45-120px), jadi varian dibuat persegi untuk 1x dan 2x
+VARIANT_SIZES = [64, 128, 256]
+VARIANT_FORMAT = 'WEBP'
+VARIANT_QUALITY = 80
+VARIANT_DIR = 'thumbs'
+
+def build_variants(field_file):
+    """
+    Buat varian WebP persegi dari sebuah ImageField. Nama file memuat hash isi foto asli,
+    sehingga URL aman di-cache selamanya (foto baru = URL baru).
+    Mengembalikan dict {'source': nama_file_asli, '64': nama_varian, ...}.
+    """
+    from PIL import Image, ImageOps
+
+    field_file.open('rb')
+    try:
+        content = field_file.read()
+    finally:
+        field_file.close()
+    digest = hashlib.sha256(content).hexdigest()[:16]
+
+    variants = {'source': field_file.name}
+    with Image.open(BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for size in VARIANT_SIZES:
+            name = f'{VARIANT_DIR}/{digest}-{size}.webp'
+            if not default_storage.exists(name):
+                buffer = BytesIO()
+                ImageOps.fit(image, (size, size), Image.LANCZOS).save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+            variants[str(size)] = name
+    return variants
+
+
+def needs_variants(field_file, variants):
+    return bool(field_file) and (variants or {}).get('source') != field_file.name
+
+
+def refresh_variants(model, pk, field_name, variants_field):
+    # Dipanggil oleh worker (tugas images.variants); update() dibatasi ke nama file yang sama agar
+    # tidak menimpa hasil upload yang lebih baru. Galat diteruskan agar tugas diulang.
+    from .cache import bump_version
+
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not needs_variants(field_file, getattr(instance, variants_field)):
+        return
+    variants = build_variants(field_file)
+    model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**{variants_field: variants})
+    bump_version('employee')
+
+
+def schedule_variants(instance, field_name, variants_field):
+    field_file = getattr(instance, field_name)
+    if not needs_variants(field_file, getattr(instance, variants_field)):
+        return
+    jobs.enqueue(
+        'images.variants', model=instance._meta.label, pk=instance.pk,
+        field_name=field_name, variants_field=variants_field,
+    )
+
+
+def variant_url(field_file, variants, size):
+    # URL varian terkecil yang cukup untuk tampilan 2x; jatuh ke file asli bila belum dibuat
+    if variants and variants.get('source') == field_file.name:
+        for variant_size in VARIANT_SIZES:
+            if variant_size >= size * 2 and str(variant_size) in variants:
+                return default_storage.url(variants[str(variant_size)])
+        largest = str(VARIANT_SIZES[-1])
+        if largest in variants:
+            return default_storage.url(variants[largest])
+    return field_file.url
+
+
+def variant_srcset(field_file, variants):
+    if not variants or variants.get('source') != field_file.name:
+        return ''
+    return ', '.join(
+        f'{default_storage.url(variants[str(size)])} {size}w'
+        for size in VARIANT_SIZES if str(size) in variants
+    )
@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from . import search
+from .cache import bump_version, clear_departments
+from .models import Employee
+
+BATCH_SIZE = 500
+REQUIRED_FIELDS = ['username', 'first_name']
+USER_FIELDS = ['username', 'email', 'first_name', 'last_name']
+EMPLOYEE_FIELDS = ['phone', 'address', 'position', 'department', 'salary', 'join_date']
+
+
+def read_rows(file, format=None):
+    # file: objek file biner (upload admin) atau teks; format 'csv'/'json', default dari nama file
+    name = getattr(file, 'name', '') or ''
+    format = format or ('json' if name.lower().endswith('.json') else 'csv')
+    content = file.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if format == 'json':
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError('File JSON harus berisi list objek karyawan.')
+        return rows
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def _clean_fields(model, data, names):
+    # Jalankan to_python dan validator field model (max_length, digit gaji, format username, ...)
+    errors = []
+    for name in names:
+        field = model._meta.get_field(name)
+        if data[name] in field.empty_values:
+            continue
+        try:
+            data[name] = field.to_python(data[name])
+            field.run_validators(data[name])
+        except ValidationError as exc:
+            errors.extend(f'Kolom {name}: {message}' for message in exc.messages)
+    return errors
+
+
+def clean_row(row, today):
+    row = {key.strip(): (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key}
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            raise ValidationError(f'Kolom {field} wajib diisi')
+    if row.get('email'):
+        validate_email(row['email'])
+    try:
+        join_date = date.fromisoformat(row['join_date']) if row.get('join_date') else today
+    except (TypeError, ValueError):
+        raise ValidationError('Tanggal bergabung harus berformat YYYY-MM-DD')
+    data = {
+        'username': row['username'],
+        'email': row.get('email') or '',
+        'first_name': row['first_name'],
+        'last_name': row.get('last_name') or '',
+        'password': row.get('password') or None,
+        'phone': row.get('phone') or '',
+        'address': row.get('address') or '',
+        'position': row.get('position') or 'Staff',
+        'department': row.get('department') or 'General',
+        'salary': row.get('salary') or 0,
+        'join_date': join_date,
+    }
+    errors = _clean_fields(User, data, USER_FIELDS) + _clean_fields(Employee, data, EMPLOYEE_FIELDS)
+    if errors:
+        raise ValidationError(errors)
+    return data
+
+
+def hash_passwords(passwords, workers=None):
+    # PBKDF2 sengaja lambat; hashing dibagi ke beberapa proses agar memakai semua core CPU.
+    # spawn: proses anak tidak mewarisi koneksi database dan thread milik request admin. Initializer
+    # harus django.setup langsung; fungsi di modul ini tidak bisa di-unpickle sebelum apps siap
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup,
+    ) as executor:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_employees(rows, workers=None, batch_size=BATCH_SIZE):
+    """
+    Buat pasangan User + Employee dari list dict. Mengembalikan
+    {'created': jumlah, 'errors': [(nomor_baris, pesan), ...]}; baris bermasalah dilewati.
+    """
+    today = timezone.localdate()
+    errors = []
+    valid = []
+    seen = set()
+    existing = set(User.objects.filter(
+        username__in=[row.get('username') for row in rows if isinstance(row, dict)],
+    ).values_list('username', flat=True))
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValidationError('Format baris tidak valid')
+            data = clean_row(row, today)
+        except ValidationError as exc:
+            errors.append((number, '; '.join(exc.messages)))
+            continue
+        if data['username'] in existing or data['username'] in seen:
+            errors.append((number, f"Username {data['username']} sudah digunakan"))
+            continue
+        seen.add(data['username'])
+        valid.append((number, data))
+
+    hashed = hash_passwords([data['password'] for _, data in valid], workers)
+
+    created = 0
+    for i in range(0, len(valid), batch_size):
+        batch = valid[i:i + batch_size]
+        passwords = hashed[i:i + batch_size]
+        try:
+            with transaction.atomic():
+                created += _create_batch(batch, passwords)
+        except DatabaseError:
+            # Batch gagal (duplikat, nilai ditolak database, ...): ulangi per baris agar hanya baris
+            # yang bermasalah yang dilewati dan pesannya tercatat per nomor baris
+            for item, password in zip(batch, passwords):
+                try:
+                    with transaction.atomic():
+                        created += _create_batch([item], [password])
+                except DatabaseError as exc:
+                    errors.append((item[0], f'Gagal disimpan: {exc}'))
+
+    if created:
+        clear_departments()
+        bump_version('employee')
+    errors.sort()
+    return {'created': created, 'errors': errors}
+
+
+def _create_batch(batch, passwords):
+    users = User.objects.bulk_create([
+        User(
+            username=data['username'], email=data['email'], password=password,
+            first_name=data['first_name'], last_name=data['last_name'],
+        )
+        for (_, data), password in zip(batch, passwords)
+    ])
+    if any(user.pk is None for user in users):
+        # Backend tanpa RETURNING: ambil id dalam satu query
+        ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'id'))
+        for user in users:
+            user.pk = ids[user.username]
+
+    Employee.objects.bulk_create([
+        Employee(
+            user=user,
+            employee_id=f"EMP{user.pk:04d}",
+            phone=data['phone'],
+            address=data['address'],
+            position=data['position'],
+            department=data['department'],
+            salary=data['salary'],
+            join_date=data['join_date'],
+        )
+        for user, (_, data) in zip(users, batch)
+    ])
+    # bulk_create melewati signal, jadi indeks pencarian diisi langsung
+    search.index_users([user.pk for user in users])
+    return len(users)
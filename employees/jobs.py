@@ -0,0 +1,187 @@
+"""
+Antrean tugas latar sederhana berbasis tabel Job, tanpa broker eksternal. View cukup memanggil
+`enqueue()` (baris Job ikut transaksi request) lalu langsung kembali; perintah run_workers
+mengambil tugas yang siap dan menjalankannya di thread pool atau process pool.
+
+Tugas didaftarkan dengan `@task('nama')` (lihat tasks.py) dan dipanggil sebagai
+`fungsi(job, **kwargs)`; `job.report(selesai, total, pesan)` memperbarui progres. Tugas yang
+gagal diulang dengan jeda eksponensial sampai max_attempts, lalu ditandai gagal.
+"""
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+RETRY_DELAY = 30  # detik; percobaan ke-n menunggu RETRY_DELAY * 2 ** (n - 1)
+# Worker memperbarui locked_at tugas yang sedang dijalankannya setiap HEARTBEAT_INTERVAL detik;
+# tugas 'running' tanpa heartbeat selama STALE_AFTER dianggap worker-nya mati
+HEARTBEAT_INTERVAL = 60
+STALE_AFTER = timedelta(minutes=5)
+
+TASKS = {}
+
+
+def task(name):
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, user=None, max_attempts=3, delay=None, **kwargs):
+    """Masukkan tugas ke antrean. kwargs harus bisa diserialisasi ke JSON (tanggal sebagai ISO)."""
+    if name not in TASKS:
+        raise ValueError(f'Tugas tidak dikenal: {name}')
+    job = Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + (delay or timedelta()),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    if getattr(settings, 'JOBS_EAGER', False):
+        # Tanpa worker (pengembangan): jalankan di proses ini setelah transaksi request selesai
+        transaction.on_commit(lambda: claim_job(job.pk) and execute(job.pk))
+    return job
+
+
+def claim_job(job_id):
+    # Klaim optimistis: hanya satu worker yang berhasil mengubah status queued -> running
+    return Job.objects.filter(pk=job_id, status='queued', attempts__lt=F('max_attempts')).update(
+        status='running', locked_at=timezone.now(), attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim(limit):
+    """Klaim paling banyak `limit` tugas yang siap dijalankan; mengembalikan list id."""
+    candidates = Job.objects.filter(status='queued', run_at__lte=timezone.now()).order_by('run_at', 'id')
+    claimed = []
+    for job_id in candidates.values_list('id', flat=True)[:limit * 2]:
+        if len(claimed) == limit:
+            break
+        if claim_job(job_id):
+            claimed.append(job_id)
+    return claimed
+
+
+def heartbeat(job_ids):
+    # Tanda worker masih hidup; tugas panjang tidak dianggap mati selama heartbeat berjalan
+    if job_ids:
+        Job.objects.filter(pk__in=job_ids, status='running').update(locked_at=timezone.now())
+
+
+def requeue_stale(now=None):
+    """
+    Kembalikan tugas yang heartbeat-nya kedaluwarsa ke antrean, atau tandai gagal bila percobaannya
+    sudah habis (tugas yang selalu mematikan worker tidak diulang terus). Mengembalikan jumlah
+    tugas yang dikembalikan ke antrean.
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - STALE_AFTER)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_at=None, finished_at=now,
+        error='Worker berhenti tanpa kabar pada percobaan terakhir.',
+        message='Gagal: worker berhenti tanpa kabar',
+    )
+    return stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued', locked_at=None, message='Dikembalikan ke antrean: worker berhenti tanpa kabar',
+    )
+
+
+class JobContext:
+    """Diteruskan ke fungsi tugas untuk melaporkan progres."""
+
+    def __init__(self, job):
+        self.job = job
+        self.id = job.pk
+
+    def report(self, done, total=None, message=''):
+        progress = min(100, int(done * 100 / total)) if total else 0
+        Job.objects.filter(pk=self.id).update(progress=progress, message=message[:255], locked_at=timezone.now())
+
+
+def execute(job_id):
+    """Jalankan satu tugas yang sudah diklaim (status running). Mengembalikan True jika berhasil."""
+    job = Job.objects.get(pk=job_id)
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Tugas tidak dikenal: {job.name}')
+        result = func(JobContext(job), **job.kwargs)
+    except Exception as exc:
+        _record_failure(job, exc)
+        return False
+    Job.objects.filter(pk=job_id).update(
+        status='done', progress=100, result=result, error='', finished_at=timezone.now(),
+    )
+    return True
+
+
+def _execute_in_worker(job_id):
+    # Setiap thread/proses worker punya koneksi database sendiri; tutup setelah tugas selesai
+    try:
+        return execute(job_id)
+    finally:
+        connection.close()
+
+
+def _record_failure(job, exc):
+    logger.exception('Tugas %s #%s gagal (percobaan %s/%s)', job.name, job.pk, job.attempts, job.max_attempts)
+    error = ''.join(traceback.format_exception(exc))[-4000:]
+    if job.attempts < job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(
+            status='queued', error=error, locked_at=None,
+            run_at=timezone.now() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1)),
+            message=f'Gagal, diulang (percobaan {job.attempts}/{job.max_attempts})',
+        )
+    else:
+        Job.objects.filter(pk=job.pk).update(status='failed', error=error, finished_at=timezone.now(), message=str(exc)[:255])
+
+
+def run_workers(workers=None, processes=False, burst=False, poll_interval=POLL_INTERVAL, log=None):
+    """
+    Loop worker: klaim tugas sebanyak slot kosong dan jalankan di pool. `burst=True` berhenti
+    saat antrean kosong (untuk cron/tes). Mengembalikan jumlah tugas yang dijalankan.
+    """
+    workers = workers or os.cpu_count() or 1
+    if processes:
+        # spawn: proses anak tidak mewarisi koneksi database milik proses induk. Initializer harus
+        # django.setup langsung; fungsi di modul ini tidak bisa di-unpickle sebelum apps siap
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jobs')
+    running = {}  # future -> id tugas
+    handled = 0
+    last_heartbeat = time.monotonic()
+    with executor:
+        while True:
+            requeue_stale()
+            claimed = claim(workers - len(running)) if len(running) < workers else []
+            for job_id in claimed:
+                running[executor.submit(_execute_in_worker, job_id)] = job_id
+                if log:
+                    log(f'Menjalankan tugas #{job_id}')
+            handled += len(claimed)
+            if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                heartbeat(list(running.values()))
+                last_heartbeat = time.monotonic()
+            if running:
+                _, pending = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                running = {future: running[future] for future in pending}
+            elif burst:
+                break
+            else:
+                time.sleep(poll_interval)
+    return handled
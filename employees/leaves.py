@@ -0,0 +1,202 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .cache import bump_version
+from .models import LeaveBalance, LeaveRequest
+
+ACTIVE_LEAVE_STATUSES = ['pending', 'approved']
+
+
+def overlapping_leaves(employee, start, end, exclude_pk=None):
+    # Dua interval [a, b] dan [c, d] beririsan bila a <= d dan c <= b; memakai index (employee, status, start_date)
+    leaves = LeaveRequest.objects.filter(
+        employee=employee,
+        status__in=ACTIVE_LEAVE_STATUSES,
+        start_date__lte=end,
+        end_date__gte=start,
+    )
+    if exclude_pk is not None:
+        leaves = leaves.exclude(pk=exclude_pk)
+    return leaves
+
+
+def absence_calendar(start, end, department=None, statuses=('approved',)):
+    """
+    Kalender ketidakhadiran untuk rentang [start, end]: satu query range atas LeaveRequest,
+    lalu sweep line atas titik awal/akhir interval untuk menghitung jumlah orang yang izin per hari.
+    Mengembalikan dict:
+      days   -> list tanggal dalam rentang
+      counts -> jumlah karyawan yang izin per tanggal (sejajar dengan days)
+      rows   -> [(employee, [leave atau None per tanggal]), ...] urut nama
+    """
+    leaves = LeaveRequest.objects.filter(
+        status__in=statuses, start_date__lte=end, end_date__gte=start,
+    ).select_related('employee__user').order_by('start_date')
+    if department:
+        leaves = leaves.filter(employee__department=department)
+
+    total_days = (end - start).days + 1
+    days = [start + timedelta(days=i) for i in range(total_days)]
+    delta = [0] * (total_days + 1)
+    rows = {}
+    for leave in leaves:
+        first = (max(leave.start_date, start) - start).days
+        last = (min(leave.end_date, end) - start).days
+        delta[first] += 1
+        delta[last + 1] -= 1
+        employee_id = leave.employee_id
+        if employee_id not in rows:
+            rows[employee_id] = (leave.employee, [None] * total_days)
+        cells = rows[employee_id][1]
+        for i in range(first, last + 1):
+            cells[i] = leave
+
+    counts = []
+    running = 0
+    for change in delta[:total_days]:
+        running += change
+        counts.append(running)
+
+    return {
+        'days': days,
+        'counts': counts,
+        'rows': sorted(rows.values(), key=lambda row: row[0].full_name.lower()),
+    }
+
+
+def days_by_year(start, end):
+    # Pecah durasi izin per tahun kalender, misalnya 30 Des - 2 Jan => {2024: 2, 2025: 2}
+    days = {}
+    while start <= end:
+        year_end = min(end, date(start.year, 12, 31))
+        days[start.year] = (year_end - start).days + 1
+        start = year_end + timedelta(days=1)
+    return days
+
+
+def get_balance(employee_id, year, leave_type):
+    balance, _ = LeaveBalance.objects.get_or_create(
+        employee_id=employee_id, year=year, leave_type=leave_type,
+        defaults={'entitlement': LeaveBalance.DEFAULT_ENTITLEMENTS.get(leave_type)},
+    )
+    return balance
+
+
+def _apply_days(employee_id, leave_type, start, end, sign):
+    for year, days in days_by_year(start, end).items():
+        if sign > 0:
+            get_balance(employee_id, year, leave_type)
+        # Dibatasi di 0: izin yang disetujui sebelum ledger ada belum tentu tercatat di `used`
+        LeaveBalance.objects.filter(employee_id=employee_id, year=year, leave_type=leave_type).update(
+            used=Greatest(F('used') + sign * days, 0),
+        )
+
+
+def lock_balances(employee, leave_type, start, end):
+    """
+    Kunci baris saldo (dibuat bila belum ada) yang tersentuh izin [start, end] sampai transaksi
+    selesai, agar dua persetujuan bersamaan tidak sama-sama lolos exceeds_quota().
+    """
+    years = list(days_by_year(start, end))
+    for year in years:
+        get_balance(employee.pk, year, leave_type)
+    return list(
+        LeaveBalance.objects.select_for_update()
+        .filter(employee=employee, leave_type=leave_type, year__in=years)
+        .order_by('year')
+    )
+
+
+def record_leave_change(old_key, new_key):
+    """
+    Perbarui saldo cuti saat LeaveRequest disimpan/dihapus. Key berbentuk
+    (employee_id, leave_type, start_date, end_date, status); None untuk baris baru/terhapus.
+    Hanya izin berstatus approved yang mengurangi saldo.
+    """
+    if old_key == new_key:
+        return
+    with transaction.atomic():
+        if old_key is not None and old_key[4] == 'approved':
+            _apply_days(*old_key[:4], -1)
+        if new_key is not None and new_key[4] == 'approved':
+            _apply_days(*new_key[:4], 1)
+
+
+def exceeds_quota(employee, leave_type, start, end, exclude=None):
+    """
+    Cek apakah izin [start, end] melebihi sisa jatah per tahun. `exclude` adalah izin yang
+    sudah tercatat di saldo (misalnya saat mengedit izin yang sudah disetujui).
+    Mengembalikan (tahun, sisa) untuk tahun pertama yang terlampaui, atau None.
+    """
+    if LeaveBalance.DEFAULT_ENTITLEMENTS.get(leave_type) is None:
+        return None
+    requested = days_by_year(start, end)
+    already = {}
+    if exclude is not None and exclude.status == 'approved' and exclude.leave_type == leave_type:
+        already = days_by_year(exclude.start_date, exclude.end_date)
+    balances = {
+        balance.year: balance
+        for balance in LeaveBalance.objects.filter(employee=employee, leave_type=leave_type, year__in=requested)
+    }
+    for year, days in requested.items():
+        balance = balances.get(year)
+        entitlement = balance.entitlement if balance else LeaveBalance.DEFAULT_ENTITLEMENTS[leave_type]
+        if entitlement is None:
+            continue
+        remaining = entitlement - (balance.used if balance else 0) + already.get(year, 0)
+        if days > remaining:
+            return year, remaining
+    return None
+
+
+def employee_balances(employee, year):
+    # Satu query ke ledger; jenis izin yang belum pernah dipakai ditampilkan dengan jatah default
+    stored = {balance.leave_type: balance for balance in LeaveBalance.objects.filter(employee=employee, year=year)}
+    balances = []
+    for leave_type, _ in LeaveRequest.LEAVE_TYPE_CHOICES:
+        balance = stored.get(leave_type) or LeaveBalance(
+            employee=employee, year=year, leave_type=leave_type,
+            entitlement=LeaveBalance.DEFAULT_ENTITLEMENTS.get(leave_type),
+        )
+        balances.append(balance)
+    return balances
+
+
+def reconcile_balances(year=None):
+    """
+    Hitung ulang kolom `used` dari seluruh izin approved (per tahun bila diberikan).
+    Jatah (entitlement) yang sudah diubah HR tetap dipertahankan.
+    """
+    leaves = LeaveRequest.objects.filter(status='approved')
+    if year is not None:
+        leaves = leaves.filter(start_date__lte=date(year, 12, 31), end_date__gte=date(year, 1, 1))
+
+    used = defaultdict(int)
+    for employee_id, leave_type, start, end in leaves.values_list('employee_id', 'leave_type', 'start_date', 'end_date').iterator():
+        for leave_year, days in days_by_year(start, end).items():
+            if year is None or leave_year == year:
+                used[(employee_id, leave_year, leave_type)] += days
+
+    balances = LeaveBalance.objects.all()
+    if year is not None:
+        balances = balances.filter(year=year)
+    with transaction.atomic():
+        balances.update(used=0)
+        LeaveBalance.objects.bulk_create(
+            [
+                LeaveBalance(
+                    employee_id=employee_id, year=leave_year, leave_type=leave_type, used=days,
+                    entitlement=LeaveBalance.DEFAULT_ENTITLEMENTS.get(leave_type),
+                )
+                for (employee_id, leave_year, leave_type), days in used.items()
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['employee', 'year', 'leave_type'],
+            update_fields=['used'],
+        )
+    # update()/bulk_create melewati signal, jadi fragmen saldo yang di-cache dibatalkan di sini
+    bump_version('leave')
+    return len(used)
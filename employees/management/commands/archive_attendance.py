@@ -0,0 +1,43 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from employees import archive
+from employees.models import Attendance, ArchivedAttendance
+
+
+class Command(BaseCommand):
+    help = (
+        'Pindahkan Kehadiran yang lebih tua dari horizon (ATTENDANCE_HOT_MONTHS) ke tabel arsip. '
+        'Aman dijalankan berulang, misalnya dari cron setiap awal bulan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', help='Arsipkan tanggal sebelum ini (YYYY-MM-DD), default sesuai horizon')
+        parser.add_argument('--restore-since', help='Kembalikan arsip mulai tanggal ini ke tabel aktif (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            before = date.fromisoformat(options['before']) if options['before'] else archive.archive_cutoff()
+            restore_since = date.fromisoformat(options['restore_since']) if options['restore_since'] else None
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+
+        if restore_since:
+            result = archive.restore_attendance(restore_since)
+            self.stdout.write(self.style.SUCCESS(f"{result['restored']} baris dikembalikan dari arsip sejak {restore_since}."))
+            self.report_conflicts(result['conflicts'], 'arsip', 'tabel aktif')
+            return
+
+        result = archive.archive_attendance(before, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['moved']} baris sebelum {before} diarsipkan. Tabel aktif: {Attendance.objects.count()} baris, "
+            f"arsip: {ArchivedAttendance.objects.count()} baris."
+        ))
+        self.report_conflicts(result['conflicts'], 'tabel aktif', 'arsip')
+
+    def report_conflicts(self, ids, source, target):
+        if ids:
+            self.stderr.write(self.style.WARNING(
+                f"{len(ids)} baris {source} tidak dipindahkan karena karyawan dan tanggalnya sudah ada di {target}; "
+                f"periksa secara manual (id: {', '.join(map(str, ids[:20]))}{' ...' if len(ids) > 20 else ''})."
+            ))
@@ -0,0 +1,105 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.urls import reverse
+from employees.models import Employee
+
+BENCH_PREFIX = 'bench-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Ukur latensi dan throughput view absensi (baca, tulis, campuran) secara konkuren '
+        'pada profil database aktif. Bandingkan misalnya SQLITE_TUNING=0 dengan default, '
+        'atau DB_PROFILE=postgres. Data benchmark dibuat sementara lalu dihapus. '
+        'Catatan: journal_mode=WAL tersimpan di file database, jadi gunakan salinan file '
+        'yang belum pernah memakai WAL untuk pengukuran pembanding SQLITE_TUNING=0.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--reads', type=int, default=400, help='Jumlah request baca per skenario')
+
+    def handle(self, *args, **options):
+        employees = self.create_employees(options['employees'])
+        try:
+            clients = self.login_clients(employees)
+            self.stdout.write(f"Database: {connection.vendor} {connection.settings_dict['NAME']}")
+            self.stdout.write(f"{'Skenario':<10}{'Request':>9}{'Gagal':>7}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}")
+
+            reads = [(clients[i % len(clients)], 'GET', reverse('employee_dashboard')) for i in range(options['reads'])]
+            check_in = [(client, 'POST', reverse('attendance_check')) for client in clients]
+            check_out = [(client, 'POST', reverse('attendance_check'), {'action': 'out'}) for client in clients]
+
+            self.report('baca', self.run(reads, options['threads']))
+            self.report('tulis', self.run(check_in, options['threads']))
+            # Campuran: check-out berjalan bersamaan dengan pembacaan dashboard
+            mixed = [job for pair in zip(check_out, reads) for job in pair]
+            self.report('campuran', self.run(mixed, options['threads']))
+        finally:
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+    def create_employees(self, count):
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        users = User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{i}', first_name='Bench', last_name=str(i), password='!')
+            for i in range(count)
+        ])
+        users = User.objects.filter(username__startswith=BENCH_PREFIX).order_by('id')
+        Employee.objects.bulk_create([
+            Employee(
+                user=user, employee_id=f'BENCH{user.pk}', phone='-', address='-', position='Staff',
+                department='Benchmark', salary=0, join_date=date.today(),
+            )
+            for user in users
+        ])
+        return list(Employee.objects.filter(user__username__startswith=BENCH_PREFIX).select_related('user'))
+
+    def login_clients(self, employees):
+        clients = []
+        for employee in employees:
+            client = Client()
+            client.force_login(employee.user)
+            clients.append(client)
+        return clients
+
+    def run(self, jobs, threads):
+        latencies, failures = [], []
+        lock = threading.Lock()
+
+        def request(job):
+            client, method, url, *data = job
+            started = time.perf_counter()
+            try:
+                if method == 'GET':
+                    response = client.get(url)
+                else:
+                    response = client.post(url, data[0] if data else {'action': 'in'}, content_type='application/json')
+                ok = response.status_code < 500
+            except Exception:
+                ok = False
+            finally:
+                close_old_connections()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    failures.append(job)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(request, jobs))
+        return len(jobs), len(failures), time.perf_counter() - started, latencies
+
+    def report(self, name, result):
+        total, failed, elapsed, latencies = result
+        latencies = sorted(latencies)
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        self.stdout.write(f'{name:<10}{total:>9}{failed:>7}{total / elapsed:>10.1f}{p50:>9.1f}{p95:>9.1f}')
@@ -0,0 +1,35 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from employees import closing
+
+
+class Command(BaseCommand):
+    help = (
+        'Tutup hari kehadiran: buat baris Tidak Hadir/Izin/Sakit untuk karyawan aktif yang tidak absen '
+        'pada hari kerja shift-nya. '
+        'Aman dijalankan berulang, misalnya dari cron setiap malam setelah jam kerja.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Tanggal yang ditutup (YYYY-MM-DD), default hari ini')
+        parser.add_argument('--start', help='Awal rentang susulan (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Akhir rentang susulan (YYYY-MM-DD), default hari ini')
+
+    def handle(self, *args, **options):
+        try:
+            if options['start']:
+                start = date.fromisoformat(options['start'])
+                end = date.fromisoformat(options['end']) if options['end'] else timezone.localdate()
+            else:
+                start = end = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+        if end < start:
+            raise CommandError('Tanggal akhir tidak boleh sebelum tanggal awal.')
+
+        result = closing.close_days(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['days']} hari ditutup ({start} s/d {end}): {result['created']} baris dibuat, "
+            f"{result['updated']} baris disesuaikan dengan izin."
+        ))
@@ -0,0 +1,127 @@
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory
+from django.utils import timezone
+from employees import async_views, rollups, views
+from employees.dashboard import abuild_admin_context, build_admin_context
+from employees.models import Attendance, Employee, LeaveRequest
+
+BENCH_PREFIX = 'async-bench-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan latensi view dashboard/daftar karyawan versi sinkron dan async '
+        '(query independen dijalankan bersamaan) pada data uji sementara. '
+        'Jalankan dengan DB_PROFILE=postgres untuk menilai hasil di deployment produksi; '
+        'pada SQLite selisihnya kecil karena query dilayani di proses yang sama.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=500)
+        parser.add_argument('--days', type=int, default=30, help='Jumlah hari absensi per karyawan')
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def handle(self, *args, **options):
+        staff, employee = self.seed(options['employees'], options['days'])
+        today = timezone.localdate()
+        try:
+            current_month = today.replace(day=1)
+            sync_factory, async_factory = RequestFactory(), AsyncRequestFactory()
+
+            def sync_request(path, user):
+                request = sync_factory.get(path)
+                request.user = user
+                return request
+
+            def async_request(path, user):
+                request = async_factory.get(path)
+                request.user = user
+
+                async def auser():
+                    return user
+                request.auser = auser
+                return request
+
+            scenarios = [
+                (
+                    'konteks dashboard admin',
+                    lambda: build_admin_context(today, current_month),
+                    lambda: abuild_admin_context(today, current_month),
+                ),
+                (
+                    'daftar karyawan',
+                    lambda: views.employee_list(sync_request('/employees/admin/employees/?page=2', staff)),
+                    lambda: async_views.employee_list(async_request('/employees/admin/employees/?page=2', staff)),
+                ),
+                (
+                    'dashboard karyawan',
+                    lambda: views.employee_dashboard(sync_request('/employees/dashboard/', employee.user)),
+                    lambda: async_views.employee_dashboard(async_request('/employees/dashboard/', employee.user)),
+                ),
+            ]
+
+            self.stdout.write(f"Database: {connection.vendor} {connection.settings_dict['NAME']}")
+            self.stdout.write(f"{'Skenario':<26}{'sync p50':>10}{'async p50':>11}{'sync p95':>10}{'async p95':>11}")
+            for name, sync_call, async_call in scenarios:
+                sync_times = self.measure(sync_call, options['repeat'])
+                async_times = self.measure(lambda: asyncio.run(async_call()), options['repeat'])
+                self.stdout.write(
+                    f'{name:<26}{self.p(sync_times, 50):>10.1f}{self.p(async_times, 50):>11.1f}'
+                    f'{self.p(sync_times, 95):>10.1f}{self.p(async_times, 95):>11.1f}'
+                )
+        finally:
+            User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+            rollups.rebuild(today - timedelta(days=options['days']), today)
+
+    def seed(self, count, days):
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        User.objects.bulk_create(
+            [User(username=f'{BENCH_PREFIX}{i}', first_name='Bench', last_name=str(i), password='!') for i in range(count)]
+            + [User(username=f'{BENCH_PREFIX}staff', is_staff=True, password='!')]
+        )
+        users = User.objects.filter(username__startswith=BENCH_PREFIX, is_staff=False).order_by('id')
+        Employee.objects.bulk_create([
+            Employee(
+                user=user, employee_id=f'ABENCH{user.pk}', phone='-', address='-', position='Staff',
+                department=f'Bench {user.pk % 5}', salary=0, join_date=date(2024, 1, 1),
+            )
+            for user in users
+        ])
+        employees = list(Employee.objects.filter(user__username__startswith=BENCH_PREFIX))
+        today = timezone.localdate()
+        Attendance.objects.bulk_create([
+            Attendance(employee=emp, date=today - timedelta(days=offset), status='present')
+            for emp in employees for offset in range(1, days + 1)
+        ], batch_size=2000, ignore_conflicts=True)
+        LeaveRequest.objects.bulk_create([
+            LeaveRequest(
+                employee=emp, leave_type='annual', start_date=today + timedelta(days=7),
+                end_date=today + timedelta(days=8), reason='-', status='pending',
+            )
+            for emp in employees[::10]
+        ])
+        # bulk_create melewati signal, jadi rekap dibangun ulang sekali
+        rollups.rebuild(today - timedelta(days=days), today)
+        staff = User.objects.get(username=f'{BENCH_PREFIX}staff')
+        employee = Employee.objects.select_related('user').filter(user__username__startswith=BENCH_PREFIX).first()
+        return staff, employee
+
+    def measure(self, call, repeat):
+        call()  # pemanasan koneksi dan template
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)
+
+    def p(self, timings, percentile):
+        if percentile == 50:
+            return statistics.median(timings)
+        return timings[max(int(len(timings) * percentile / 100) - 1, 0)]
@@ -0,0 +1,40 @@
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from employees import exports
+
+
+class Command(BaseCommand):
+    help = 'Ekspor data Attendance, LeaveRequest atau Salary ke CSV/XLSX secara streaming.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.DATASETS))
+        parser.add_argument('--start', help='Tanggal awal (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Tanggal akhir (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', help='File tujuan, default stdout (hanya CSV)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+
+        dataset = options['dataset']
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('Ekspor XLSX membutuhkan --output')
+            try:
+                exports.write_xlsx(dataset, options['output'], start, end)
+            except ImportError:
+                raise CommandError('Ekspor XLSX membutuhkan library openpyxl.')
+            return
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in exports.stream_csv(dataset, start, end):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from employees.cache import bump_version
+from employees.images import build_variants, needs_variants
+from employees.models import Developer, Employee
+
+
+class Command(BaseCommand):
+    help = 'Buat varian thumbnail WebP untuk foto karyawan dan developer yang sudah ada.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Buat ulang walaupun varian sudah ada')
+
+    def handle(self, *args, **options):
+        targets = [
+            (Employee, 'photo', 'photo_variants'),
+            (Developer, 'image', 'image_variants'),
+        ]
+        for model, field_name, variants_field in targets:
+            done = failed = 0
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in queryset.only('pk', field_name, variants_field).iterator():
+                field_file = getattr(instance, field_name)
+                if not options['force'] and not needs_variants(field_file, getattr(instance, variants_field)):
+                    continue
+                try:
+                    variants = build_variants(field_file)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{model.__name__} #{instance.pk}: {exc}')
+                    continue
+                model.objects.filter(pk=instance.pk).update(**{variants_field: variants})
+                done += 1
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {done} diproses, {failed} gagal.'))
+        bump_version('employee')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from employees.importer import BATCH_SIZE, import_employees, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Impor banyak karyawan (User + Employee) dari file CSV atau JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Path file CSV/JSON')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Default ditentukan dari ekstensi file')
+        parser.add_argument('--workers', type=int, help='Jumlah proses untuk hashing password, default jumlah CPU')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['file'], 'rb') as file:
+                rows = read_rows(file, options['format'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Tidak bisa membaca file: {exc}')
+
+        result = import_employees(rows, workers=options['workers'], batch_size=options['batch_size'])
+        for number, message in result['errors']:
+            self.stderr.write(f'Baris {number}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} karyawan diimpor, {len(result['errors'])} baris gagal."
+        ))
@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from employees import rollups
+from employees.models import AttendanceDailySummary, AttendanceMonthlySummary
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang tabel rekap kehadiran harian dan bulanan dari data Attendance.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Tanggal awal (YYYY-MM-DD), default seluruh data')
+        parser.add_argument('--end', help='Tanggal akhir (YYYY-MM-DD), default seluruh data')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+
+        rollups.rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rekap dibangun ulang: {AttendanceDailySummary.objects.count()} baris harian, '
+            f'{AttendanceMonthlySummary.objects.count()} baris bulanan.'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from employees import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Bangun ulang indeks pencarian teks penuh karyawan dan izin. Jalankan setelah perubahan '
+        'massal yang tidak memicu signal (bulk_create, update(), impor SQL langsung).'
+    )
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING('Backend database tidak mendukung indeks teks penuh; pencarian memakai icontains.'))
+            return
+        search.create_tables()
+        counts = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indeks pencarian dibangun ulang: {counts['employee']} karyawan, {counts['leave']} izin."
+        ))
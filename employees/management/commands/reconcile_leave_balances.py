@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from employees.leaves import reconcile_balances
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang saldo cuti (LeaveBalance) dari seluruh izin yang disetujui.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Hanya tahun tertentu, default semua tahun')
+
+    def handle(self, *args, **options):
+        count = reconcile_balances(options['year'])
+        self.stdout.write(self.style.SUCCESS(f'{count} saldo cuti direkonsiliasi.'))
@@ -0,0 +1,24 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from employees import schedules
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung ulang status hadir/terlambat dan menit terlambat dari shift saat ini, '
+        'misalnya setelah jam shift atau hari libur diubah untuk tanggal yang sudah lewat.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='Tanggal awal (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Tanggal akhir (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start'])
+            end = date.fromisoformat(options['end'])
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+
+        changed = schedules.restamp(start, end)
+        self.stdout.write(self.style.SUCCESS(f'{changed} kehadiran diperbarui ({start} s/d {end}).'))
@@ -0,0 +1,26 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from employees.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = 'Buat data gaji bulanan untuk seluruh karyawan aktif.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Bulan payroll (YYYY-MM), default bulan ini')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = date.fromisoformat(f"{options['month']}-01")
+            except ValueError:
+                raise CommandError('Format bulan harus YYYY-MM')
+        else:
+            month = timezone.localdate().replace(day=1)
+
+        result = run_payroll(month)
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll {month:%B %Y}: {result['created']} dibuat, {result['updated']} diperbarui, "
+            f"{result['skipped']} dilewati (sudah dibayar)."
+        ))
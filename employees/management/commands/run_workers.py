@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from employees import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Jalankan worker antrean tugas latar (payroll, ekspor, varian foto, notifikasi). '
+        'Tanpa --burst perintah terus berjalan dan memeriksa antrean setiap --poll detik.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Jumlah tugas paralel, default jumlah CPU')
+        parser.add_argument('--processes', action='store_true', help='Pakai process pool alih-alih thread (tugas berat CPU)')
+        parser.add_argument('--burst', action='store_true', help='Berhenti saat antrean kosong')
+        parser.add_argument('--poll', type=float, default=jobs.POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        try:
+            handled = jobs.run_workers(
+                workers=options['workers'], processes=options['processes'],
+                burst=options['burst'], poll_interval=options['poll'], log=log,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker dihentikan.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'{handled} tugas dijalankan.'))
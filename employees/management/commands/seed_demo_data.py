@@ -0,0 +1,196 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from employees import leaves, payroll, rollups, schedules, search
+from employees.cache import VERSIONED_MODELS, bump_version, clear_departments
+from employees.models import Attendance, Employee, LeaveRequest, Salary
+
+DEMO_PREFIX = 'demo.'
+DEMO_PASSWORD = 'demo12345'
+BATCH_SIZE = 2000
+
+FIRST_NAMES = ['Andi', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko',
+               'Kartika', 'Lukman', 'Maya', 'Nanda', 'Oki', 'Putri', 'Rizky', 'Sari', 'Taufik', 'Wulan']
+LAST_NAMES = ['Pratama', 'Saputra', 'Wijaya', 'Lestari', 'Kusuma', 'Hidayat', 'Nugroho', 'Santoso',
+              'Permata', 'Siregar', 'Utami', 'Halim']
+DEPARTMENTS = {
+    'IT': ['Software Engineer', 'Data Analyst', 'System Administrator'],
+    'HR': ['HR Officer', 'Recruiter'],
+    'Finance': ['Accountant', 'Finance Staff'],
+    'Marketing': ['Marketing Executive', 'Content Specialist'],
+    'Operations': ['Operations Staff', 'Supervisor'],
+}
+# Bobot status kehadiran harian untuk hari tanpa izin
+DAILY_STATUSES = [('present', 86), ('late', 9), ('absent', 5)]
+LEAVE_TYPES = [('annual', 50), ('sick', 25), ('personal', 15), ('other', 8), ('marriage', 2)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Buat data demo realistis: N karyawan dengan riwayat Kehadiran, Izin dan Gaji beberapa tahun. '
+        'Hasilnya deterministik untuk --seed dan --until yang sama. Akun demo memakai username '
+        f'"{DEMO_PREFIX}*" dan password "{DEMO_PASSWORD}".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=100)
+        parser.add_argument('--years', type=int, default=2, help='Panjang riwayat dalam tahun')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--until', help='Hari terakhir riwayat (YYYY-MM-DD), default kemarin')
+        parser.add_argument('--clear', action='store_true', help='Hapus data demo sebelumnya lalu buat ulang')
+
+    def handle(self, *args, **options):
+        try:
+            until = date.fromisoformat(options['until']) if options['until'] else timezone.localdate() - timedelta(days=1)
+        except ValueError as exc:
+            raise CommandError(f'Format tanggal tidak valid: {exc}')
+        start = date(until.year - options['years'], until.month, 1)
+
+        demo_users = User.objects.filter(username__startswith=DEMO_PREFIX)
+        if demo_users.exists():
+            if not options['clear']:
+                raise CommandError('Data demo sudah ada. Gunakan --clear untuk membuat ulang.')
+            demo_users.delete()
+
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            employees = self.create_employees(rng, options['employees'], start, until)
+            leave_days = self.create_leaves(rng, employees, start, until)
+            attendances = self.create_attendance(rng, employees, leave_days, start, until)
+            # bulk_create melewati signal, jadi rekap dan saldo cuti dihitung ulang sekali di akhir
+            rollups.rebuild(start, until)
+            for year in range(start.year, until.year + 1):
+                leaves.reconcile_balances(year)
+            search.rebuild()
+            salaries = self.create_salaries(rng, employees, start, until)
+
+        clear_departments()
+        for name in VERSIONED_MODELS:
+            bump_version(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(employees)} karyawan, {attendances} kehadiran, {sum(map(len, leave_days.values()))} hari izin '
+            f'dan {salaries} slip gaji dibuat untuk {start} s/d {until}.'
+        ))
+
+    def create_employees(self, rng, count, start, until):
+        password = make_password(DEMO_PASSWORD)
+        users = []
+        for i in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            users.append(User(
+                username=f'{DEMO_PREFIX}{i:05d}', first_name=first, last_name=last,
+                email=f'{first.lower()}.{last.lower()}{i}@demo.local', password=password,
+            ))
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        users = User.objects.filter(username__startswith=DEMO_PREFIX).order_by('username')
+
+        employees = []
+        history_days = (until - start).days
+        for i, user in enumerate(users):
+            department = rng.choice(list(DEPARTMENTS))
+            # Sebagian besar karyawan sudah bergabung sebelum awal riwayat, sisanya di tengah periode
+            if rng.random() < 0.8:
+                join_date = start - timedelta(days=rng.randint(0, 1500))
+            else:
+                join_date = start + timedelta(days=rng.randint(0, history_days))
+            employees.append(Employee(
+                user=user, employee_id=f'DEMO{i:05d}', phone=f'08{rng.randint(10**9, 10**10 - 1)}',
+                address=f'Jl. Demo No. {rng.randint(1, 200)}, Jakarta', department=department,
+                position=rng.choice(DEPARTMENTS[department]),
+                salary=Decimal(rng.randrange(4_500_000, 20_000_000, 250_000)),
+                join_date=join_date, is_active=rng.random() > 0.05,
+            ))
+        Employee.objects.bulk_create(employees, batch_size=BATCH_SIZE)
+        return list(Employee.objects.filter(user__username__startswith=DEMO_PREFIX).order_by('employee_id'))
+
+    def create_leaves(self, rng, employees, start, until):
+        """Buat izin yang tidak saling tumpang tindih; kembalikan {employee_id: {tanggal: jenis}} izin approved."""
+        requests, leave_days = [], {}
+        types, weights = zip(*LEAVE_TYPES)
+        for employee in employees:
+            days = leave_days[employee.pk] = {}
+            day = max(start, employee.join_date)
+            while True:
+                day += timedelta(days=rng.randint(20, 120))
+                if day > until + timedelta(days=30):
+                    break
+                leave_type = rng.choices(types, weights)[0]
+                end = day + timedelta(days=rng.randint(0, 4 if leave_type == 'marriage' else 2))
+                if day > until:
+                    status = 'pending'
+                else:
+                    status = rng.choices(['approved', 'rejected'], [85, 15])[0]
+                requests.append(LeaveRequest(
+                    employee=employee, leave_type=leave_type, start_date=day, end_date=end,
+                    reason='Data demo', status=status,
+                ))
+                if status == 'approved':
+                    days.update({day + timedelta(days=i): leave_type for i in range((end - day).days + 1)})
+                day = end
+        LeaveRequest.objects.bulk_create(requests, batch_size=BATCH_SIZE)
+        return leave_days
+
+    def create_attendance(self, rng, employees, leave_days, start, until):
+        statuses, weights = zip(*DAILY_STATUSES)
+        total = 0
+        # Dibuat per kelompok karyawan agar memori tetap kecil untuk data bertahun-tahun
+        for offset in range(0, len(employees), 50):
+            rows = []
+            for employee in employees[offset:offset + 50]:
+                day = max(start, employee.join_date)
+                while day <= until:
+                    if day.weekday() < 5:
+                        rows.append(self.attendance_row(rng, employee, day, leave_days[employee.pk].get(day), statuses, weights))
+                    day += timedelta(days=1)
+            Attendance.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+            total += len(rows)
+        return total
+
+    def attendance_row(self, rng, employee, day, leave_type, statuses, weights):
+        if leave_type:
+            status = 'sick' if leave_type == 'sick' else 'permission'
+        else:
+            status = rng.choices(statuses, weights)[0]
+        check_in = check_out = None
+        if status == 'present':
+            check_in = time(7, rng.randint(15, 59))
+        elif status == 'late':
+            check_in = (datetime.combine(day, time(8, 1)) + timedelta(minutes=rng.randint(0, 90))).time()
+        late_minutes = 0
+        if check_in:
+            check_out = time(rng.randint(16, 18), rng.randint(0, 59))
+            # bulk_create melewati signal pre_save; data demo memakai shift bawaan 08:00
+            status, late_minutes = schedules.DEFAULT_SHIFT.evaluate(check_in)
+        return Attendance(
+            employee=employee, date=day, status=status, check_in=check_in, check_out=check_out, late_minutes=late_minutes,
+            location='Kantor Pusat' if check_in else '',
+        )
+
+    def create_salaries(self, rng, employees, start, until):
+        months = []
+        month = start
+        while month <= until:
+            months.append(month)
+            month = rollups.next_month(month)
+
+        Salary.objects.bulk_create([
+            Salary(
+                employee=employee, month=month, basic_salary=employee.salary,
+                allowance=Decimal(rng.randrange(0, 2_000_000, 100_000)),
+                bonus=Decimal(rng.randrange(0, 3_000_000, 250_000)) if month.month == 12 else Decimal(0),
+            )
+            for employee in employees for month in months if month >= rollups.month_start(employee.join_date)
+        ], batch_size=BATCH_SIZE)
+        # Potongan dihitung oleh payroll dari rekap kehadiran dan izin tak berbayar
+        demo = Employee.objects.filter(pk__in=[employee.pk for employee in employees])
+        for month in months:
+            payroll.run_payroll(month, demo.filter(join_date__lt=rollups.next_month(month)))
+        paid = Salary.objects.filter(employee__in=employees, month__lt=rollups.month_start(until))
+        for month in months:
+            paid.filter(month=month).update(payment_date=rollups.next_month(month))
+        return Salary.objects.filter(employee__in=employees).count()
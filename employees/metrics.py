@@ -0,0 +1,165 @@
+"""
+Instrumentasi per request: jumlah query SQL, waktu database, waktu render template dan total waktu,
+diagregasi per view ke histogram in-process yang dibaca endpoint /metrics (format teks Prometheus).
+Registry disimpan per proses; pada deployment multi-worker setiap worker punya angkanya sendiri.
+"""
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from django.template.backends.django import DjangoTemplates, Template
+
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+QUERY_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+HISTOGRAMS = {
+    'django_view_duration_seconds': ('Total waktu request per view', DURATION_BUCKETS),
+    'django_view_db_seconds': ('Waktu eksekusi SQL per request', DURATION_BUCKETS),
+    'django_view_template_seconds': ('Waktu render template per request', DURATION_BUCKETS),
+    'django_view_queries': ('Jumlah query SQL per request', QUERY_BUCKETS),
+}
+N_PLUS_ONE_COUNTER = 'django_view_repeated_query_total'
+
+# Kumpulan metrik request yang sedang berjalan; ikut tersalin ke thread sync_to_async
+current_request = ContextVar('current_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+        self.lock = threading.Lock()
+
+    def add_query(self, sql, duration):
+        with self.lock:
+            self.queries += 1
+            self.db_time += duration
+            self.statements[sql] += 1
+
+    def add_template(self, duration):
+        with self.lock:
+            self.template_time += duration
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, threshold):
+        # SQL dengan placeholder identik yang dijalankan berulang kali = pola N+1
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper yang dipasang di setiap koneksi database."""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = current_request.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.add_template(time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend template Django yang mencatat waktu render ke metrik request aktif."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = Counter()
+
+    def observe(self, view, metrics, repeated):
+        values = {
+            'django_view_duration_seconds': metrics.total_time,
+            'django_view_db_seconds': metrics.db_time,
+            'django_view_template_seconds': metrics.template_time,
+            'django_view_queries': metrics.queries,
+        }
+        with self.lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self.histograms[key].observe(value)
+            if repeated:
+                self.counters[(N_PLUS_ONE_COUNTER, view)] += 1
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (metric, view), hist in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    label = f'view="{escape_label(view)}"'
+                    # counts sudah kumulatif: observe menaikkan semua bucket dengan batas >= nilai
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {hist.count}')
+                    lines.append(f'{name}_sum{{{label}}} {hist.sum:.6f}')
+                    lines.append(f'{name}_count{{{label}}} {hist.count}')
+            lines += [
+                f'# HELP {N_PLUS_ONE_COUNTER} Request dengan pola query berulang (N+1)',
+                f'# TYPE {N_PLUS_ONE_COUNTER} counter',
+            ]
+            for (_, view), count in sorted(self.counters.items()):
+                lines.append(f'{N_PLUS_ONE_COUNTER}{{view="{escape_label(view)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
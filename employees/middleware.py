@@ -0,0 +1,130 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.utils.functional import SimpleLazyObject
+from django.db import connections
+from django.db.backends.signals import connection_created
+from .metrics import RequestMetrics, current_request, install_query_recorder, registry
+
+logger = logging.getLogger(__name__)
+
+connection_created.connect(install_query_recorder)
+
+
+class RequestMetricsMiddleware:
+    """
+    Catat jumlah query, waktu database, waktu render template dan total waktu per view,
+    kirim header Server-Timing, dan beri peringatan saat ada pola query berulang (N+1).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'REPEATED_QUERY_THRESHOLD', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, metrics)
+
+    def start(self):
+        # Koneksi yang dibuat sebelum middleware dimuat tidak melewati signal connection_created
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        metrics = RequestMetrics()
+        return metrics, current_request.set(metrics)
+
+    def finish(self, request, response, metrics):
+        # Header Server-Timing terkirim sebelum isi respons, sehingga untuk respons streaming
+        # angkanya hanya sampai header; histogram dan deteksi N+1 dicatat setelah isi selesai
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} query"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'total;dur={metrics.total_time * 1000:.1f}',
+        ])
+        # FileResponse berkas biasa dikirim lewat file_wrapper tanpa query; jangan dibungkus
+        if response.streaming and not getattr(response, 'file_to_stream', None):
+            if response.is_async:
+                response.streaming_content = self.astream(request, response.streaming_content, metrics)
+            else:
+                response.streaming_content = self.stream(request, response.streaming_content, metrics)
+        else:
+            self.record(request, metrics)
+        return response
+
+    def stream(self, request, content, metrics):
+        # Query yang dijalankan saat isi streaming dibangkitkan ikut dihitung ke request ini
+        try:
+            iterator = iter(content)
+            while True:
+                token = current_request.set(metrics)
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    current_request.reset(token)
+                yield chunk
+        finally:
+            self.record(request, metrics)
+
+    async def astream(self, request, content, metrics):
+        try:
+            iterator = aiter(content)
+            while True:
+                token = current_request.set(metrics)
+                try:
+                    chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    current_request.reset(token)
+                yield chunk
+        finally:
+            self.record(request, metrics)
+
+    def record(self, request, metrics):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        repeated = metrics.repeated_queries(self.threshold)
+        for sql, count in repeated:
+            logger.warning('Pola N+1 di %s %s: query dijalankan %d kali: %s', view, request.path, count, sql)
+        registry.observe(view, metrics, bool(repeated))
+
+
+LEGACY_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+
+
+class IdentityMiddleware:
+    """
+    Pasang setelah AuthenticationMiddleware. request.employee berisi Employee milik user
+    (atau None), diambil dari User yang sudah di-JOIN oleh IdentityBackend dan
+    dihitung paling banyak sekali per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Sesi lama yang login lewat ModelBackend dialihkan ke backend aktif agar tidak ter-logout
+        if request.session.get(BACKEND_SESSION_KEY) in LEGACY_BACKENDS:
+            request.session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        request.employee = SimpleLazyObject(lambda: getattr(request.user, 'employee', None))
+        return self.get_response(request)
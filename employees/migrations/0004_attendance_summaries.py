@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0, verbose_name='Hadir')),
+                ('late', models.PositiveIntegerField(default=0, verbose_name='Terlambat')),
+                ('absent', models.PositiveIntegerField(default=0, verbose_name='Tidak Hadir')),
+                ('permission', models.PositiveIntegerField(default=0, verbose_name='Izin')),
+                ('sick', models.PositiveIntegerField(default=0, verbose_name='Sakit')),
+                ('date', models.DateField(unique=True, verbose_name='Tanggal')),
+            ],
+            options={
+                'verbose_name': 'Rekap Kehadiran Harian',
+                'verbose_name_plural': 'Rekap Kehadiran Harian',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0, verbose_name='Hadir')),
+                ('late', models.PositiveIntegerField(default=0, verbose_name='Terlambat')),
+                ('absent', models.PositiveIntegerField(default=0, verbose_name='Tidak Hadir')),
+                ('permission', models.PositiveIntegerField(default=0, verbose_name='Izin')),
+                ('sick', models.PositiveIntegerField(default=0, verbose_name='Sakit')),
+                ('month', models.DateField(verbose_name='Bulan')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Rekap Kehadiran Bulanan',
+                'verbose_name_plural': 'Rekap Kehadiran Bulanan',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['month'], name='att_monthly_month_idx')],
+                'unique_together': {('employee', 'month')},
+            },
+        ),
+    ]
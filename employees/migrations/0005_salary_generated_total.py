@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:24
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_attendance_summaries'),
+    ]
+
+    # Kolom biasa tidak bisa diubah langsung menjadi GeneratedField, jadi dihapus lalu dibuat ulang.
+    # Nilainya diturunkan dari kolom lain sehingga tidak ada data yang hilang.
+    operations = [
+        migrations.RemoveField(
+            model_name='salary',
+            name='total_salary',
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='total_salary',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('basic_salary'), '+', models.F('allowance')), '+', models.F('bonus')), '-', models.F('deduction')), output_field=models.DecimalField(decimal_places=2, max_digits=12), verbose_name='Total Gaji'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_leave_range_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Tahun')),
+                ('leave_type', models.CharField(choices=[('sick', 'Sakit'), ('annual', 'Cuti Tahunan'), ('personal', 'Keperluan Pribadi'), ('marriage', 'Pernikahan'), ('maternity', 'Melahirkan'), ('other', 'Lainnya')], max_length=50, verbose_name='Jenis Izin')),
+                ('entitlement', models.PositiveIntegerField(blank=True, null=True, verbose_name='Jatah (hari)')),
+                ('used', models.PositiveIntegerField(default=0, verbose_name='Terpakai (hari)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_balances', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Saldo Cuti',
+                'verbose_name_plural': 'Saldo Cuti',
+                'ordering': ['-year', 'leave_type'],
+                'unique_together': {('employee', 'year', 'leave_type')},
+            },
+        ),
+    ]
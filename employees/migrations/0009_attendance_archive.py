@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0008_leave_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=django.utils.timezone.now, verbose_name='Tanggal')),
+                ('check_in', models.TimeField(blank=True, null=True, verbose_name='Jam Masuk')),
+                ('check_out', models.TimeField(blank=True, null=True, verbose_name='Jam Keluar')),
+                ('status', models.CharField(choices=[('present', 'Hadir'), ('late', 'Terlambat'), ('absent', 'Tidak Hadir'), ('permission', 'Izin'), ('sick', 'Sakit')], default='present', max_length=20, verbose_name='Status')),
+                ('notes', models.TextField(blank=True, verbose_name='Catatan')),
+                ('location', models.CharField(blank=True, max_length=255, verbose_name='Lokasi')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Arsip Kehadiran',
+                'verbose_name_plural': 'Arsip Kehadiran',
+                'ordering': ['-date', '-check_in'],
+                'indexes': [models.Index(fields=['date'], name='att_archive_date_idx')],
+                'unique_together': {('employee', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Salinan tetap dari employees/search.py saat migrasi ini dibuat: migrasi tidak boleh bergantung pada
+# kode aplikasi yang bisa berubah. Perubahan format dokumen berikutnya dibuat di migrasi baru.
+TABLES = {
+    'employee': 'employees_employee_search',
+    'leave': 'employees_leaverequest_search',
+}
+
+
+def _sources(qn):
+    names = [f"u.{qn('first_name')}", f"u.{qn('last_name')}"]
+    employee_columns = names + [f"u.{qn('username')}"] + [f"e.{qn(c)}" for c in ('employee_id', 'position', 'department', 'phone')]
+    leave_columns = names + [f"e.{qn('employee_id')}", f"l.{qn('reason')}"]
+    return {
+        'employee': (
+            f"e.{qn('id')}", " || ' ' || ".join(employee_columns),
+            f"FROM {qn('employees_employee')} e JOIN {qn('auth_user')} u ON u.{qn('id')} = e.{qn('user_id')}",
+        ),
+        'leave': (
+            f"l.{qn('id')}", " || ' ' || ".join(leave_columns),
+            f"FROM {qn('employees_leaverequest')} l "
+            f"JOIN {qn('employees_employee')} e ON e.{qn('id')} = l.{qn('employee_id')} "
+            f"JOIN {qn('auth_user')} u ON u.{qn('id')} = e.{qn('user_id')}",
+        ),
+    }
+
+
+def create_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor not in ('sqlite', 'postgresql'):
+        return
+    qn = conn.ops.quote_name
+    sources = _sources(qn)
+    with conn.cursor() as cursor:
+        for kind, table in TABLES.items():
+            name = qn(table)
+            pk, text, source = sources[kind]
+            if conn.vendor == 'sqlite':
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} "
+                    f"USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+                )
+                cursor.execute(f"INSERT OR REPLACE INTO {name} (rowid, document) SELECT {pk}, {text} {source}")
+            else:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} (id bigint PRIMARY KEY, document tsvector NOT NULL)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {qn(table + '_gin')} ON {name} USING gin (document)")
+                # Isi awal dari data yang sudah ada; selanjutnya dijaga oleh signal
+                cursor.execute(
+                    f"INSERT INTO {name} (id, document) SELECT {pk}, to_tsvector('simple', {text}) {source} "
+                    f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document"
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor not in ('sqlite', 'postgresql'):
+        return
+    with conn.cursor() as cursor:
+        for table in TABLES.values():
+            cursor.execute(f"DROP TABLE IF EXISTS {conn.ops.quote_name(table)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_attendance_archive'),
+    ]
+
+    # Tabel FTS5 (SQLite) / tsvector + GIN (PostgreSQL) di luar model, lihat employees/search.py
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
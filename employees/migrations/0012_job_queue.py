@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0011_admin_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Tugas')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Argumen')),
+                ('status', models.CharField(choices=[('queued', 'Menunggu'), ('running', 'Berjalan'), ('done', 'Selesai'), ('failed', 'Gagal')], default='queued', max_length=10, verbose_name='Status')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progres (%)')),
+                ('message', models.CharField(blank=True, max_length=255, verbose_name='Keterangan')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Hasil')),
+                ('error', models.TextField(blank=True, verbose_name='Galat')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Maks. Percobaan')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Dijalankan Mulai')),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tugas Latar',
+                'verbose_name_plural': 'Tugas Latar',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_at'], name='job_status_run_idx'), models.Index(fields=['created_at'], name='job_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:13
+
+import django.core.validators
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def stamp_existing_lateness(apps, schema_editor):
+    # Status lama tidak diubah; baris yang sudah 'late' hanya diisi menit terlambatnya dengan aturan
+    # sebelum ada shift (masuk setelah 08:00)
+    for name in ('Attendance', 'ArchivedAttendance'):
+        model = apps.get_model('employees', name)
+        stamps = defaultdict(list)
+        rows = model.objects.filter(status='late', check_in__isnull=False).values_list('id', 'check_in')
+        for pk, check_in in rows.iterator():
+            seconds = check_in.hour * 3600 + check_in.minute * 60 + check_in.second - 8 * 3600
+            if seconds > 0:
+                stamps[(seconds + 59) // 60].append(pk)
+        for minutes, ids in stamps.items():
+            for i in range(0, len(ids), 500):
+                model.objects.filter(pk__in=ids[i:i + 500]).update(late_minutes=minutes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0012_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Tanggal')),
+                ('name', models.CharField(max_length=100, verbose_name='Keterangan')),
+            ],
+            options={
+                'verbose_name': 'Hari Libur',
+                'verbose_name_plural': 'Hari Libur',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Shift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nama Shift')),
+                ('start_time', models.TimeField(verbose_name='Jam Mulai')),
+                ('end_time', models.TimeField(verbose_name='Jam Selesai')),
+                ('grace_minutes', models.PositiveSmallIntegerField(default=0, verbose_name='Toleransi Terlambat (menit)')),
+                ('weekdays', models.CharField(default='1111100', help_text='7 digit Senin s/d Minggu, 1 = hari kerja. Contoh: 1111100 = Senin-Jumat', max_length=7, validators=[django.core.validators.RegexValidator('^[01]{7}$', '7 digit 0/1, Senin s/d Minggu')], verbose_name='Hari Kerja')),
+                ('department', models.CharField(blank=True, help_text='Berlaku untuk seluruh karyawan departemen ini yang tidak punya shift sendiri', max_length=100, verbose_name='Departemen')),
+                ('is_default', models.BooleanField(default=False, verbose_name='Bawaan Perusahaan')),
+            ],
+            options={
+                'verbose_name': 'Shift',
+                'verbose_name_plural': 'Shift',
+                'ordering': ['start_time', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedattendance',
+            name='late_minutes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Menit Terlambat'),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='late_minutes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Menit Terlambat'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedattendance',
+            index=models.Index(condition=models.Q(('late_minutes__gt', 0)), fields=['date', 'employee', 'late_minutes'], name='att_archive_late_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('late_minutes__gt', 0)), fields=['date', 'employee', 'late_minutes'], name='att_late_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='shift',
+            constraint=models.UniqueConstraint(condition=models.Q(('department', ''), _negated=True), fields=('department',), name='shift_unique_department'),
+        ),
+        migrations.AddConstraint(
+            model_name='shift',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('is_default',), name='shift_single_default'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='shift',
+            field=models.ForeignKey(blank=True, help_text='Kosongkan untuk memakai shift departemen atau bawaan perusahaan', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='employees.shift', verbose_name='Shift'),
+        ),
+        migrations.RunPython(stamp_existing_lateness, migrations.RunPython.noop),
+    ]
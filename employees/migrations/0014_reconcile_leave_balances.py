@@ -0,0 +1,60 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db import migrations
+
+# Salinan tetap jatah bawaan LeaveBalance saat migrasi ini dibuat
+DEFAULT_ENTITLEMENTS = {
+    'annual': 12,
+    'personal': 3,
+    'marriage': 3,
+    'maternity': 90,
+    'sick': None,
+    'other': None,
+}
+
+
+def days_by_year(start, end):
+    days = {}
+    while start <= end:
+        year_end = min(end, date(start.year, 12, 31))
+        days[start.year] = (year_end - start).days + 1
+        start = year_end + timedelta(days=1)
+    return days
+
+
+def reconcile_leave_balances(apps, schema_editor):
+    # Ledger dibuat kosong di 0008; izin yang sudah disetujui sebelumnya harus masuk ke `used`.
+    # Memakai model historis, bukan employees.leaves, agar migrasi tidak ikut berubah bersama kode.
+    LeaveRequest = apps.get_model('employees', 'LeaveRequest')
+    LeaveBalance = apps.get_model('employees', 'LeaveBalance')
+    used = defaultdict(int)
+    rows = LeaveRequest.objects.filter(status='approved').values_list('employee_id', 'leave_type', 'start_date', 'end_date')
+    for employee_id, leave_type, start, end in rows.iterator():
+        for year, days in days_by_year(start, end).items():
+            used[(employee_id, year, leave_type)] += days
+
+    LeaveBalance.objects.update(used=0)
+    LeaveBalance.objects.bulk_create(
+        [
+            LeaveBalance(
+                employee_id=employee_id, year=year, leave_type=leave_type, used=days,
+                entitlement=DEFAULT_ENTITLEMENTS.get(leave_type),
+            )
+            for (employee_id, year, leave_type), days in used.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['employee', 'year', 'leave_type'],
+        update_fields=['used'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0013_shift_schedules'),
+    ]
+
+    operations = [
+        migrations.RunPython(reconcile_leave_balances, migrations.RunPython.noop),
+    ]
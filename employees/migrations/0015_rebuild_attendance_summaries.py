@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+STATUSES = ['present', 'late', 'absent', 'permission', 'sick']
+BATCH_SIZE = 1000
+
+
+def _grouped(querysets, keys):
+    # Jumlahkan hitungan status per kunci dari tabel aktif dan arsip
+    counts = {status: Count('id', filter=Q(status=status)) for status in STATUSES}
+    totals = {}
+    for queryset in querysets:
+        for row in queryset.order_by().values(*keys).annotate(**counts).iterator():
+            key = tuple(row[k] for k in keys)
+            if key in totals:
+                for status in STATUSES:
+                    totals[key][status] += row[status]
+            else:
+                totals[key] = row
+    return totals.values()
+
+
+def rebuild_attendance_summaries(apps, schema_editor):
+    # Tabel rekap dibuat kosong di 0004; isi dari data kehadiran yang sudah ada. Memakai model
+    # historis, bukan employees.rollups, agar migrasi tidak ikut berubah bersama kode.
+    raw = [apps.get_model('employees', name).objects.all() for name in ('Attendance', 'ArchivedAttendance')]
+    daily = apps.get_model('employees', 'AttendanceDailySummary')
+    monthly = apps.get_model('employees', 'AttendanceMonthlySummary')
+    daily.objects.all().delete()
+    monthly.objects.all().delete()
+    daily.objects.bulk_create((daily(**row) for row in _grouped(raw, ['date'])), batch_size=BATCH_SIZE)
+    monthly.objects.bulk_create(
+        (monthly(**row) for row in _grouped([qs.annotate(month=TruncMonth('date')) for qs in raw], ['employee_id', 'month'])),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0014_reconcile_leave_balances'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_attendance_summaries, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,100 @@
+from datetime import timedelta
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import RegexValidator
 from django.utils import timezone
-from datetime import datetime
 
 
 class Developer(models.Model):
     name = models.CharField(max_length=100)
     role = models.CharField(max_length=100)
     image = models.ImageField(upload_to='developers/') # Membutuhkan library Pillow
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ['order']
-        
+
+
+class Shift(models.Model):
+    # Jadwal kerja; dipakai per karyawan (Employee.shift), per departemen, atau sebagai bawaan perusahaan
+    name = models.CharField(max_length=100, verbose_name='Nama Shift')
+    start_time = models.TimeField(verbose_name='Jam Mulai')
+    end_time = models.TimeField(verbose_name='Jam Selesai')
+    grace_minutes = models.PositiveSmallIntegerField(default=0, verbose_name='Toleransi Terlambat (menit)')
+    weekdays = models.CharField(
+        max_length=7, default='1111100', verbose_name='Hari Kerja',
+        validators=[RegexValidator(r'^[01]{7}$', '7 digit 0/1, Senin s/d Minggu')],
+        help_text='7 digit Senin s/d Minggu, 1 = hari kerja. Contoh: 1111100 = Senin-Jumat',
+    )
+    department = models.CharField(
+        max_length=100, blank=True, verbose_name='Departemen',
+        help_text='Berlaku untuk seluruh karyawan departemen ini yang tidak punya shift sendiri',
+    )
+    is_default = models.BooleanField(default=False, verbose_name='Bawaan Perusahaan')
+
+    class Meta:
+        verbose_name = 'Shift'
+        verbose_name_plural = 'Shift'
+        ordering = ['start_time', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['department'], condition=~models.Q(department=''), name='shift_unique_department'),
+            models.UniqueConstraint(fields=['is_default'], condition=models.Q(is_default=True), name='shift_single_default'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.start_time:%H:%M}-{self.end_time:%H:%M})"
+
+    def is_workday(self, day):
+        return self.weekdays[day.weekday()] == '1'
+
+    @property
+    def is_overnight(self):
+        return self.end_time < self.start_time
+
+    def _seconds(self, value):
+        return value.hour * 3600 + value.minute * 60 + value.second
+
+    def _belongs_to_previous_day(self, moment):
+        # Shift malam (mis. 22:00-06:00): jam sebelum titik tengah jeda (14:00) milik shift kemarin,
+        # sehingga check-out 06:00 atau lembur sampai pagi tetap masuk baris malam sebelumnya
+        if not self.is_overnight:
+            return False
+        cutoff = (self._seconds(self.end_time) + self._seconds(self.start_time)) // 2
+        return self._seconds(moment) < cutoff
+
+    def shift_date(self, moment):
+        """Tanggal kehadiran untuk waktu lokal `moment` (datetime); shift malam dicatat di tanggal mulainya."""
+        if self._belongs_to_previous_day(moment.time()):
+            return moment.date() - timedelta(days=1)
+        return moment.date()
+
+    def evaluate(self, check_in):
+        """(status, menit terlambat) untuk jam masuk `check_in`; menit dihitung dari jam mulai shift."""
+        seconds = self._seconds(check_in) - self._seconds(self.start_time)
+        if self._belongs_to_previous_day(check_in):
+            # Masuk lewat tengah malam dihitung dari jam mulai kemarin
+            seconds += 24 * 3600
+        if seconds <= self.grace_minutes * 60:
+            return 'present', 0
+        return 'late', (seconds + 59) // 60
+
+
+class Holiday(models.Model):
+    date = models.DateField(unique=True, verbose_name='Tanggal')
+    name = models.CharField(max_length=100, verbose_name='Keterangan')
+
+    class Meta:
+        verbose_name = 'Hari Libur'
+        verbose_name_plural = 'Hari Libur'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date} - {self.name}"
+
+
 class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='employee')
     employee_id = models.CharField(max_length=20, unique=True, verbose_name='ID Karyawan')
@@ -21,9 +102,15 @@ class Employee(models.Model):
     address = models.TextField(verbose_name='Alamat')
     position = models.CharField(max_length=100, verbose_name='Jabatan')
     department = models.CharField(max_length=100, verbose_name='Departemen', default='General')
+    shift = models.ForeignKey(
+        Shift, on_delete=models.SET_NULL, null=True, blank=True, related_name='employees', verbose_name='Shift',
+        help_text='Kosongkan untuk memakai shift departemen atau bawaan perusahaan',
+    )
     salary = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Gaji')
     join_date = models.DateField(verbose_name='Tanggal Bergabung')
     photo = models.ImageField(upload_to='employee_photos/', blank=True, null=True, verbose_name='Foto')
+    # Varian thumbnail WebP yang dibuat di latar belakang (lihat images.py)
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True, verbose_name='Status Aktif')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -32,6 +119,11 @@ class Employee(models.Model):
         verbose_name = 'Karyawan'
         verbose_name_plural = 'Karyawan'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['department'], name='employee_department_idx'),
+            models.Index(fields=['position'], name='employee_position_idx'),
+            models.Index(fields=['is_active', 'department'], name='employee_active_dept_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee_id} - {self.user.get_full_name()}"
@@ -40,7 +132,8 @@ class Employee(models.Model):
     def full_name(self):
         return self.user.get_full_name() or self.user.username
 
-class Attendance(models.Model):
+class AttendanceRecord(models.Model):
+    # Kolom bersama tabel Attendance (aktif) dan ArchivedAttendance (arsip, lihat archive.py)
     STATUS_CHOICES = [
         ('present', 'Hadir'),
         ('late', 'Terlambat'),
@@ -49,30 +142,118 @@ class Attendance(models.Model):
         ('sick', 'Sakit'),
     ]
     
-    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendances')
     date = models.DateField(default=timezone.now, verbose_name='Tanggal')
     check_in = models.TimeField(null=True, blank=True, verbose_name='Jam Masuk')
     check_out = models.TimeField(null=True, blank=True, verbose_name='Jam Keluar')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='present', verbose_name='Status')
+    # Dihitung sekali saat disimpan dari shift karyawan (lihat schedules.py), bukan saat dibaca
+    late_minutes = models.PositiveIntegerField(default=0, verbose_name='Menit Terlambat')
     notes = models.TextField(blank=True, verbose_name='Catatan')
     location = models.CharField(max_length=255, blank=True, verbose_name='Lokasi')
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.employee.full_name} - {self.date} - {self.get_status_display()}"
+
+    def rollup_key(self):
+        date = self._meta.get_field('date').to_python(self.__dict__.get('date'))
+        return (self.employee_id, date, self.__dict__.get('status'))
+
+class Attendance(AttendanceRecord):
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendances')
     
     class Meta:
         verbose_name = 'Kehadiran'
         verbose_name_plural = 'Kehadiran'
         unique_together = ['employee', 'date']
         ordering = ['-date', '-check_in']
-    
+        indexes = [
+            # Urutan default dan filter status/tanggal changelist admin
+            models.Index(fields=['date', 'check_in'], name='att_date_checkin_idx'),
+            models.Index(fields=['status', 'date'], name='att_status_date_idx'),
+            # Laporan keterlambatan: indeks parsial kecil yang hanya memuat baris terlambat
+            models.Index(fields=['date', 'employee', 'late_minutes'], condition=models.Q(late_minutes__gt=0), name='att_late_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Simpan nilai awal agar signal rollup tahu bucket mana yang harus dikurangi
+        instance._rollup_key = instance.rollup_key()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._rollup_key = self.rollup_key()
+
+    def clean(self):
+        super().clean()
+        # Tanggal yang sudah diarsipkan tidak boleh punya baris kedua di tabel aktif
+        if self.employee_id and self.date and ArchivedAttendance.objects.filter(employee_id=self.employee_id, date=self.date).exists():
+            raise ValidationError({
+                'date': 'Kehadiran tanggal ini sudah diarsipkan. Kembalikan dulu dengan archive_attendance --restore-since.',
+            })
+
+class ArchivedAttendance(AttendanceRecord):
+    # Baris Attendance yang lebih tua dari horizon arsip; id asli dipertahankan
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='archived_attendances')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Arsip Kehadiran'
+        verbose_name_plural = 'Arsip Kehadiran'
+        unique_together = ['employee', 'date']
+        ordering = ['-date', '-check_in']
+        indexes = [
+            models.Index(fields=['date'], name='att_archive_date_idx'),
+            models.Index(fields=['status', 'date'], name='att_archive_status_idx'),
+            models.Index(fields=['date', 'employee', 'late_minutes'], condition=models.Q(late_minutes__gt=0), name='att_archive_late_idx'),
+        ]
+
+class AttendanceCounts(models.Model):
+    present = models.PositiveIntegerField(default=0, verbose_name='Hadir')
+    late = models.PositiveIntegerField(default=0, verbose_name='Terlambat')
+    absent = models.PositiveIntegerField(default=0, verbose_name='Tidak Hadir')
+    permission = models.PositiveIntegerField(default=0, verbose_name='Izin')
+    sick = models.PositiveIntegerField(default=0, verbose_name='Sakit')
+
+    class Meta:
+        abstract = True
+
+    def as_stats(self):
+        return {status: getattr(self, status) for status, _ in Attendance.STATUS_CHOICES}
+
+class AttendanceDailySummary(AttendanceCounts):
+    # Rekap seluruh karyawan per hari, dipelihara oleh signal Attendance (lihat rollups.py)
+    date = models.DateField(unique=True, verbose_name='Tanggal')
+
+    class Meta:
+        verbose_name = 'Rekap Kehadiran Harian'
+        verbose_name_plural = 'Rekap Kehadiran Harian'
+        ordering = ['-date']
+
     def __str__(self):
-        return f"{self.employee.full_name} - {self.date} - {self.get_status_display()}"
-    
-    @property
-    def is_late(self):
-        if self.check_in:
-            work_start = datetime.strptime('08:00', '%H:%M').time()
-            return self.check_in > work_start
-        return False
+        return f"Rekap {self.date}"
+
+class AttendanceMonthlySummary(AttendanceCounts):
+    # Rekap per karyawan per bulan; month selalu tanggal 1
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_summaries')
+    month = models.DateField(verbose_name='Bulan')
+
+    class Meta:
+        verbose_name = 'Rekap Kehadiran Bulanan'
+        verbose_name_plural = 'Rekap Kehadiran Bulanan'
+        unique_together = ['employee', 'month']
+        ordering = ['-month']
+        indexes = [
+            models.Index(fields=['month'], name='att_monthly_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.month.strftime('%B %Y')}"
 
 class LeaveRequest(models.Model):
     LEAVE_TYPE_CHOICES = [
@@ -106,6 +287,12 @@ class LeaveRequest(models.Model):
         verbose_name = 'Permohonan Izin'
         verbose_name_plural = 'Permohonan Izin'
         ordering = ['-created_at']
+        indexes = [
+            # Cek overlap per karyawan dan kalender ketidakhadiran (query range tanggal)
+            models.Index(fields=['employee', 'status', 'start_date', 'end_date'], name='leave_employee_range_idx'),
+            models.Index(fields=['status', 'start_date', 'end_date'], name='leave_status_range_idx'),
+            models.Index(fields=['created_at'], name='leave_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee.full_name} - {self.get_leave_type_display()} - {self.get_status_display()}"
@@ -114,6 +301,56 @@ class LeaveRequest(models.Model):
     def duration_days(self):
         return (self.end_date - self.start_date).days + 1
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nilai awal untuk memperbarui saldo cuti saat status/tanggal berubah (lihat leaves.py)
+        instance._ledger_key = instance.ledger_key()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._ledger_key = self.ledger_key()
+
+    def ledger_key(self):
+        data = self.__dict__
+        start_date = self._meta.get_field('start_date').to_python(data.get('start_date'))
+        end_date = self._meta.get_field('end_date').to_python(data.get('end_date'))
+        return (self.employee_id, data.get('leave_type'), start_date, end_date, data.get('status'))
+
+class LeaveBalance(models.Model):
+    # Jatah cuti per tahun; None berarti tidak dibatasi
+    DEFAULT_ENTITLEMENTS = {
+        'annual': 12,
+        'personal': 3,
+        'marriage': 3,
+        'maternity': 90,
+        'sick': None,
+        'other': None,
+    }
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_balances')
+    year = models.PositiveSmallIntegerField(verbose_name='Tahun')
+    leave_type = models.CharField(max_length=50, choices=LeaveRequest.LEAVE_TYPE_CHOICES, verbose_name='Jenis Izin')
+    entitlement = models.PositiveIntegerField(null=True, blank=True, verbose_name='Jatah (hari)')
+    used = models.PositiveIntegerField(default=0, verbose_name='Terpakai (hari)')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Saldo Cuti'
+        verbose_name_plural = 'Saldo Cuti'
+        unique_together = ['employee', 'year', 'leave_type']
+        ordering = ['-year', 'leave_type']
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.year} - {self.get_leave_type_display()}"
+
+    @property
+    def remaining(self):
+        if self.entitlement is None:
+            return None
+        return self.entitlement - self.used
+
 class Salary(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='salary_records')
     month = models.DateField(verbose_name='Bulan')
@@ -121,7 +358,13 @@ class Salary(models.Model):
     allowance = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Tunjangan')
     bonus = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Bonus')
     deduction = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Potongan')
-    total_salary = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Total Gaji')
+    # Dihitung oleh database sehingga tetap benar pada bulk_create/queryset.update
+    total_salary = models.GeneratedField(
+        expression=models.F('basic_salary') + models.F('allowance') + models.F('bonus') - models.F('deduction'),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+        verbose_name='Total Gaji',
+    )
     payment_date = models.DateField(null=True, blank=True, verbose_name='Tanggal Pembayaran')
     notes = models.TextField(blank=True, verbose_name='Catatan')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -131,11 +374,58 @@ class Salary(models.Model):
         verbose_name_plural = 'Gaji'
         unique_together = ['employee', 'month']
         ordering = ['-month']
+        indexes = [
+            models.Index(fields=['month'], name='salary_month_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee.full_name} - {self.month.strftime('%B %Y')}"
-    
-    def save(self, *args, **kwargs):
-        self.total_salary = self.basic_salary + self.allowance + self.bonus - self.deduction
-        super().save(*args, **kwargs)
-        
\ No newline at end of file
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Bulan awal, agar cache analitik bulan lama ikut kedaluwarsa jika bulannya diubah
+        instance._month = instance.__dict__.get('month')
+        return instance
+
+
+class Job(models.Model):
+    # Antrean tugas latar berbasis database; dijalankan oleh perintah run_workers (lihat jobs.py)
+    STATUS_CHOICES = [
+        ('queued', 'Menunggu'),
+        ('running', 'Berjalan'),
+        ('done', 'Selesai'),
+        ('failed', 'Gagal'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='Tugas')
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name='Argumen')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name='Status')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='Progres (%)')
+    message = models.CharField(max_length=255, blank=True, verbose_name='Keterangan')
+    result = models.JSONField(null=True, blank=True, verbose_name='Hasil')
+    error = models.TextField(blank=True, verbose_name='Galat')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Percobaan')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='Maks. Percobaan')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='Dijalankan Mulai')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Tugas Latar'
+        verbose_name_plural = 'Tugas Latar'
+        ordering = ['-created_at']
+        indexes = [
+            # Worker mengambil tugas: status='queued' AND run_at <= sekarang, urut run_at
+            models.Index(fields=['status', 'run_at'], name='job_status_run_idx'),
+            models.Index(fields=['created_at'], name='job_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} - {self.get_status_display()}"
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
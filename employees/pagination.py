@@ -0,0 +1,89 @@
+from datetime import date
+from operator import attrgetter
+from django.core.paginator import Paginator
+from django.db import connection, DatabaseError
+from django.utils.functional import cached_property
+
+# Batas COUNT(*) untuk changelist admin tabel besar; lebih dari ini jumlah ditampilkan sebagai batas
+COUNT_LIMIT = 10000
+
+
+def parse_cursor(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, field, before=None, after=None, size=30):
+    """
+    Pagination keyset (cursor) untuk daftar yang diurutkan menurun berdasarkan `field`.
+    Nilai `field` harus unik di dalam queryset, misalnya `date` untuk satu karyawan.
+    Biaya tiap halaman konstan karena memakai index, bukan OFFSET.
+    `queryset` boleh berupa list beberapa queryset (mis. tabel aktif dan arsip); tiap
+    queryset diambil paling banyak size + 1 baris lalu digabung.
+    Mengembalikan (rows, newer_cursor, older_cursor).
+    """
+    querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+    key = attrgetter(field)
+    if after is not None:
+        rows = sorted(
+            (row for qs in querysets for row in qs.filter(**{f'{field}__gt': after}).order_by(field)[:size + 1]),
+            key=key,
+        )[:size + 1]
+        has_newer = len(rows) > size
+        rows = rows[:size][::-1]
+        has_older = True
+    else:
+        if before is not None:
+            querysets = [qs.filter(**{f'{field}__lt': before}) for qs in querysets]
+        rows = sorted(
+            (row for qs in querysets for row in qs.order_by(f'-{field}')[:size + 1]),
+            key=key, reverse=True,
+        )[:size + 1]
+        has_older = len(rows) > size
+        rows = rows[:size]
+        has_newer = before is not None
+
+    newer = getattr(rows[0], field) if rows and has_newer else None
+    older = getattr(rows[-1], field) if rows and has_older else None
+    return rows, newer, older
+
+
+def estimated_count(model):
+    """
+    Perkiraan jumlah baris dari statistik database (reltuples di PostgreSQL, sqlite_stat1 setelah
+    ANALYZE di SQLite) tanpa memindai tabel. None jika statistik belum tersedia.
+    """
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql, params = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [connection.ops.quote_name(table)]
+    elif connection.vendor == 'sqlite':
+        sql, params = 'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s', [table]
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 baru ada setelah ANALYZE pertama
+        return None
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator untuk changelist admin di atas tabel besar. Queryset tanpa filter memakai
+    estimated_count(); queryset terfilter dihitung dengan COUNT(*) yang dibatasi COUNT_LIMIT baris,
+    sehingga membuka changelist tidak pernah memindai seluruh tabel.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model)
+            if estimate is not None and estimate > COUNT_LIMIT:
+                return estimate
+        return queryset.order_by()[:COUNT_LIMIT].count()
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from . import schedules
+from .cache import bump_version, month_version
+from .models import Employee, AttendanceMonthlySummary, LeaveRequest, Salary
+from .rollups import month_start, next_month
+
+# Aturan potongan gaji bulanan
+WORKING_DAYS_PER_MONTH = 22
+LATE_DEDUCTION_RATE = Decimal('0.25')  # bagian dari gaji harian per keterlambatan
+UNPAID_LEAVE_TYPES = ['personal', 'other']
+BATCH_SIZE = 500
+
+CENT = Decimal('0.01')
+
+
+def leave_days_in_month(month, employees):
+    # Jumlah hari kerja (menurut shift karyawan, tanpa hari libur) yang tercakup izin tak berbayar
+    # yang disetujui di bulan tersebut, per karyawan; sejalan dengan gaji harian per hari kerja
+    first, last = month, next_month(month) - timedelta(days=1)
+    leaves = LeaveRequest.objects.filter(
+        employee__in=employees, status='approved', leave_type__in=UNPAID_LEAVE_TYPES,
+        start_date__lte=last, end_date__gte=first,
+    ).values_list('employee_id', 'employee__shift_id', 'employee__department', 'start_date', 'end_date')
+    days = defaultdict(int)
+    for employee_id, shift_id, department, start, end in leaves:
+        shift = schedules.shift_for(shift_id, department)
+        day, end = max(start, first), min(end, last)
+        while day <= end:
+            days[employee_id] += schedules.is_workday(shift, day)
+            day += timedelta(days=1)
+    return days
+
+
+def calculate_deduction(basic_salary, absent, late, unpaid_leave_days):
+    daily_rate = basic_salary / WORKING_DAYS_PER_MONTH
+    deduction = daily_rate * (absent + unpaid_leave_days) + daily_rate * LATE_DEDUCTION_RATE * late
+    return min(deduction, basic_salary).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def run_payroll(month, employees=None):
+    """
+    Buat/perbarui baris Salary bulan `month` untuk semua karyawan aktif (atau `employees`).
+    Semua input diambil dengan beberapa query ter-grup, lalu ditulis per batch
+    dengan bulk upsert. Baris yang sudah dibayar (payment_date terisi) tidak diubah.
+    """
+    month = month_start(month)
+    if employees is None:
+        employees = Employee.objects.all()
+    employees = employees.filter(is_active=True).order_by('id')
+
+    paid = set(Salary.objects.filter(month=month, payment_date__isnull=False).values_list('employee_id', flat=True))
+    existing = set(Salary.objects.filter(month=month).values_list('employee_id', flat=True))
+    counts = {
+        employee_id: (absent, late)
+        for employee_id, absent, late in AttendanceMonthlySummary.objects.filter(
+            month=month, employee__in=employees,
+        ).values_list('employee_id', 'absent', 'late')
+    }
+    leave_days = leave_days_in_month(month, employees)
+
+    rows = []
+    for employee_id, basic_salary in employees.values_list('id', 'salary').iterator():
+        if employee_id in paid:
+            continue
+        absent, late = counts.get(employee_id, (0, 0))
+        rows.append(Salary(
+            employee_id=employee_id,
+            month=month,
+            basic_salary=basic_salary,
+            deduction=calculate_deduction(basic_salary, absent, late, leave_days[employee_id]),
+            notes=f'Payroll otomatis: {absent} alpa, {late} terlambat, {leave_days[employee_id]} hari izin tak berbayar',
+        ))
+
+    for i in range(0, len(rows), BATCH_SIZE):
+        with transaction.atomic():
+            Salary.objects.bulk_create(
+                rows[i:i + BATCH_SIZE],
+                update_conflicts=True,
+                unique_fields=['employee', 'month'],
+                update_fields=['basic_salary', 'deduction', 'notes'],
+            )
+    bump_version('salary')
+    bump_version(month_version('salary', month))
+
+    created = sum(1 for row in rows if row.employee_id not in existing)
+    return {'created': created, 'updated': len(rows) - created, 'skipped': len(paid)}
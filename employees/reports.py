@@ -0,0 +1,119 @@
+"""
+Laporan matriks kehadiran bulanan: karyawan x tanggal per departemen, dengan total per status,
+menit keterlambatan (kolom late_minutes yang dihitung saat absen) dan tingkat ketidakhadiran. Data diambil dengan satu values_list per tabel
+(aktif dan arsip), lalu dipivot dan diagregasi dengan array NumPy.
+NumPy opsional; modul ini hanya diimpor oleh view laporan.
+"""
+import csv
+from datetime import timedelta
+import numpy as np
+from django.utils.safestring import mark_safe
+from .archive import sources
+from .models import Attendance, Employee
+from .rollups import STATUSES, next_month
+
+# Kode satu huruf per status untuk sel matriks; indeks terakhir = tidak ada data
+STATUS_CODES = {'present': 'H', 'late': 'T', 'absent': 'A', 'permission': 'I', 'sick': 'S'}
+CODE_LETTERS = np.array([STATUS_CODES[status] for status in STATUSES] + [''])
+# Sel HTML siap pakai per kode; merender ribuan sel lewat {% for %} terlalu lambat untuk 500+ karyawan
+CELL_HTML = np.array([f'<td class="c{letter}">{letter}</td>' for letter in CODE_LETTERS])
+PRESENT = STATUSES.index('present')
+LATE = STATUSES.index('late')
+ABSENT = STATUSES.index('absent')
+
+
+def attendance_matrix(month, department=None):
+    """
+    Matriks kehadiran `month` (tanggal 1) untuk karyawan aktif di `department` (atau semua).
+    Mengembalikan dict berisi days, employees, grid (huruf per sel), counts per status,
+    late_minutes, absence_rate (alpa / hari tercatat) dan daily (total per status per hari).
+    """
+    end = next_month(month)
+    days = [month + timedelta(days=i) for i in range((end - month).days)]
+
+    employees = Employee.objects.filter(is_active=True).select_related('user').order_by('employee_id')
+    filters = {'date__gte': month, 'date__lt': end, 'employee__is_active': True}
+    if department:
+        employees = employees.filter(department=department)
+        filters['employee__department'] = department
+    employees = list(employees)
+
+    rows = [
+        row for queryset in sources(**filters)
+        for row in queryset.values_list('employee_id', 'date__day', 'status', 'late_minutes')
+    ]
+    ids = np.array([employee.pk for employee in employees], dtype=np.int64)
+    n_emp, n_days, n_status = len(employees), len(days), len(STATUSES)
+
+    grid = np.full((n_emp, n_days), n_status, dtype=np.int8)
+    counts = np.zeros((n_emp, n_status), dtype=np.int64)
+    daily = np.zeros((n_days, n_status), dtype=np.int64)
+    late_minutes = np.zeros(n_emp, dtype=np.int64)
+
+    if rows and n_emp:
+        employee_ids, day_numbers, statuses, late = zip(*rows)
+        # employees diurutkan per employee_id, bukan pk; argsort agar searchsorted bisa dipakai
+        order = np.argsort(ids)
+        emp = order[np.searchsorted(ids, np.array(employee_ids, dtype=np.int64), sorter=order)]
+        day = np.array(day_numbers, dtype=np.int64) - 1
+        known = np.array(STATUSES)
+        status_order = np.argsort(known)
+        values = np.array(statuses)
+        position = np.searchsorted(known, values, sorter=status_order).clip(max=n_status - 1)
+        code = status_order[position]
+        valid = known[code] == values
+
+        emp, day, code = emp[valid], day[valid], code[valid]
+        grid[emp, day] = code
+        np.add.at(counts, (emp, code), 1)
+        np.add.at(daily, (day, code), 1)
+
+        late_minutes = np.bincount(emp, weights=np.array(late, dtype=np.int64)[valid], minlength=n_emp).astype(np.int64)
+
+    recorded = counts.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        absence_rate = np.where(recorded > 0, counts[:, ABSENT] / recorded * 100, 0.0)
+
+    return {
+        'month': month,
+        'department': department,
+        'days': days,
+        'statuses': STATUSES,
+        'employees': employees,
+        'codes': grid,
+        'grid': CODE_LETTERS[grid],
+        'counts': counts,
+        'late_minutes': late_minutes,
+        'absence_rate': absence_rate,
+        'daily': daily,
+        'daily_present': (daily[:, PRESENT] + daily[:, LATE]).tolist(),
+        'totals': counts.sum(axis=0),
+    }
+
+
+def matrix_rows(report):
+    """Baris siap tampil: (employee, HTML sel per hari, total per status, menit terlambat, % alpa)."""
+    cells = CELL_HTML[report['codes']]
+    return [
+        (employee, mark_safe(''.join(row)), counts, int(late), round(float(rate), 1))
+        for employee, row, counts, late, rate in zip(
+            report['employees'], cells.tolist(), report['counts'].tolist(),
+            report['late_minutes'], report['absence_rate'],
+        )
+    ]
+
+
+def write_csv(report, output):
+    labels = dict(Attendance.STATUS_CHOICES)
+    writer = csv.writer(output)
+    writer.writerow(
+        ['ID Karyawan', 'Nama', 'Departemen']
+        + [day.isoformat() for day in report['days']]
+        + [labels[status] for status in report['statuses']]
+        + ['Menit Terlambat', 'Tingkat Alpa (%)']
+    )
+    for employee, cells, counts, late, rate in zip(
+        report['employees'], report['grid'].tolist(), report['counts'].tolist(),
+        report['late_minutes'].tolist(), report['absence_rate'].round(1).tolist(),
+    ):
+        writer.writerow([employee.employee_id, employee.full_name, employee.department, *cells, *counts, late, rate])
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest, TruncMonth
+from .cache import bump_version
+from .models import Attendance, ArchivedAttendance, AttendanceDailySummary, AttendanceMonthlySummary
+
+STATUSES = [status for status, _ in Attendance.STATUS_CHOICES]
+BATCH_SIZE = 1000
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def empty_stats():
+    return {status: 0 for status in STATUSES}
+
+
+def apply(employee_id, day, status, delta):
+    # Update inkremental dengan F() agar aman saat banyak absensi masuk bersamaan; dibatasi di 0
+    # bila rekap belum memuat baris lama (misalnya sebelum rebuild pertama)
+    if status not in STATUSES:
+        return
+    change = {status: Greatest(F(status) + delta, 0)}
+    if delta > 0:
+        AttendanceDailySummary.objects.get_or_create(date=day)
+        AttendanceMonthlySummary.objects.get_or_create(employee_id=employee_id, month=month_start(day))
+    # Pengurangan tidak membuat baris baru (misalnya saat Employee dihapus beserta rekapnya)
+    AttendanceDailySummary.objects.filter(date=day).update(**change)
+    AttendanceMonthlySummary.objects.filter(employee_id=employee_id, month=month_start(day)).update(**change)
+
+
+def record_save(attendance):
+    old = getattr(attendance, '_rollup_key', None)
+    new = attendance.rollup_key()
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            apply(*old, -1)
+        apply(*new, 1)
+    attendance._rollup_key = new
+
+
+def record_delete(attendance):
+    old = getattr(attendance, '_rollup_key', None) or attendance.rollup_key()
+    apply(*old, -1)
+
+
+def _status_counts():
+    return {status: Count('id', filter=Q(status=status)) for status in STATUSES}
+
+
+def _grouped(querysets, keys):
+    # Jumlahkan hitungan status per kunci dari beberapa sumber (tabel aktif dan arsip)
+    totals = {}
+    for queryset in querysets:
+        for row in queryset.order_by().values(*keys).annotate(**_status_counts()).iterator():
+            key = tuple(row[k] for k in keys)
+            if key in totals:
+                for status in STATUSES:
+                    totals[key][status] += row[status]
+            else:
+                totals[key] = row
+    return totals.values()
+
+
+def rebuild(start=None, end=None):
+    """
+    Hitung ulang rekap dari tabel Attendance dan arsipnya untuk rentang [start, end]
+    (inklusif), atau seluruh data bila tidak diberikan. Dipakai oleh perintah
+    rebuild_attendance_summary dan oleh operasi bulk yang melewati signal.
+    """
+    if start is not None:
+        start = month_start(start)
+    raw = [Attendance.objects.all(), ArchivedAttendance.objects.all()]
+    daily = AttendanceDailySummary.objects.all()
+    monthly = AttendanceMonthlySummary.objects.all()
+    if start is not None:
+        raw = [qs.filter(date__gte=start) for qs in raw]
+        daily = daily.filter(date__gte=start)
+        monthly = monthly.filter(month__gte=start)
+    if end is not None:
+        # Rekap bulanan selalu dihitung ulang untuk bulan penuh
+        until = next_month(end)
+        raw = [qs.filter(date__lt=until) for qs in raw]
+        daily = daily.filter(date__lt=until)
+        monthly = monthly.filter(month__lt=until)
+
+    with transaction.atomic():
+        daily.delete()
+        monthly.delete()
+        AttendanceDailySummary.objects.bulk_create(
+            (AttendanceDailySummary(**row) for row in _grouped(raw, ['date'])),
+            batch_size=BATCH_SIZE,
+        )
+        AttendanceMonthlySummary.objects.bulk_create(
+            (AttendanceMonthlySummary(**row) for row in _grouped(
+                [qs.annotate(month=TruncMonth('date')) for qs in raw], ['employee_id', 'month'],
+            )),
+            batch_size=BATCH_SIZE,
+        )
+    bump_version('attendance')
+
+
+def employee_month_stats(employee, month):
+    summary = AttendanceMonthlySummary.objects.filter(employee=employee, month=month_start(month)).first()
+    return summary.as_stats() if summary else empty_stats()
+
+
+def company_day_stats(day):
+    summary = AttendanceDailySummary.objects.filter(date=day).first()
+    return summary.as_stats() if summary else empty_stats()
+
+
+def company_range_stats(start, end=None):
+    summaries = AttendanceDailySummary.objects.filter(date__gte=start)
+    if end is not None:
+        summaries = summaries.filter(date__lte=end)
+    totals = summaries.aggregate(**{status: Sum(status) for status in STATUSES})
+    return {status: totals[status] or 0 for status in STATUSES}
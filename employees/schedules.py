@@ -0,0 +1,118 @@
+"""
+Jadwal kerja: shift per karyawan, per departemen atau bawaan perusahaan, ditambah kalender hari
+libur. Status hadir/terlambat dan menit keterlambatan dihitung sekali saat Attendance ditulis
+(check-in, ORM lewat signal pre_save) dan disimpan di kolom berindeks, sehingga laporan
+keterlambatan cukup membaca kolom tersebut. Konfigurasi shift di-cache; signal menghapusnya.
+"""
+from datetime import time
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from . import rollups
+from .models import Attendance, Employee, Holiday, Shift
+
+SCHEDULE_CACHE_KEY = 'employees:schedule'
+SCHEDULE_CACHE_TIMEOUT = 60 * 60
+BATCH_SIZE = 2000
+
+# Dipakai bila belum ada Shift yang berlaku: Senin-Jumat mulai 08:00 tanpa toleransi
+DEFAULT_SHIFT = Shift(name='Reguler', start_time=time(8, 0), end_time=time(17, 0))
+
+
+def _load():
+    shifts = {shift.pk: shift for shift in Shift.objects.all()}
+    return {
+        'shifts': shifts,
+        'departments': {shift.department: shift.pk for shift in shifts.values() if shift.department},
+        'default': next((shift.pk for shift in shifts.values() if shift.is_default), None),
+        'holidays': frozenset(Holiday.objects.values_list('date', flat=True)),
+    }
+
+
+def get_schedule():
+    return cache.get_or_set(SCHEDULE_CACHE_KEY, _load, SCHEDULE_CACHE_TIMEOUT)
+
+
+def clear_schedule():
+    cache.delete(SCHEDULE_CACHE_KEY)
+
+
+def holidays():
+    return get_schedule()['holidays']
+
+
+def shift_for(shift_id, department):
+    """Shift yang berlaku: milik karyawan, lalu departemennya, lalu bawaan perusahaan."""
+    schedule = get_schedule()
+    for pk in (shift_id, schedule['departments'].get(department), schedule['default']):
+        if pk in schedule['shifts']:
+            return schedule['shifts'][pk]
+    return DEFAULT_SHIFT
+
+
+def is_workday(shift, day):
+    return shift.is_workday(day) and day not in holidays()
+
+
+def attendance_date(employee, now=None):
+    """Tanggal baris Attendance untuk waktu `now`: tanggal mulai shift yang sedang berjalan."""
+    return shift_for(employee.shift_id, employee.department).shift_date(timezone.localtime(now))
+
+
+def evaluate(employee, day, check_in):
+    """
+    (status, menit terlambat) untuk check-in `employee`; `day` adalah tanggal shift (lihat
+    attendance_date), sehingga hari kerja shift malam dicek pada hari mulainya. Masuk di hari
+    libur tidak dihitung terlambat.
+    """
+    shift = shift_for(employee.shift_id, employee.department)
+    if not is_workday(shift, day):
+        return 'present', 0
+    return shift.evaluate(check_in)
+
+
+def stamp(attendance):
+    # Dipanggil dari signal pre_save: status hadir/terlambat mengikuti jam masuk dan shift
+    if attendance.check_in is None or attendance.status not in ('present', 'late'):
+        attendance.late_minutes = 0
+        return
+    employee = attendance._state.fields_cache.get('employee')
+    if employee is None:
+        employee = Employee.objects.only('shift', 'department').get(pk=attendance.employee_id)
+    attendance.status, attendance.late_minutes = evaluate(employee, attendance.date, attendance.check_in)
+
+
+def weekdays_sql(employee):
+    """
+    Ekspresi SQL berisi string hari kerja shift yang berlaku untuk alias karyawan `employee`,
+    dengan urutan prioritas yang sama seperti shift_for(). Mengembalikan (sql, params).
+    """
+    table = connection.ops.quote_name(Shift._meta.db_table)
+    sql = (
+        f"COALESCE("
+        f"(SELECT s.weekdays FROM {table} s WHERE s.id = {employee}.shift_id), "
+        f"(SELECT s.weekdays FROM {table} s WHERE s.department = {employee}.department AND s.department <> ''), "
+        f"(SELECT s.weekdays FROM {table} s WHERE s.is_default = %s), %s)"
+    )
+    return sql, [True, DEFAULT_SHIFT.weekdays]
+
+
+def restamp(start, end):
+    """
+    Hitung ulang status hadir/terlambat dan menit terlambat kehadiran [start, end] dengan shift
+    saat ini, misalnya setelah jadwal diubah surut. Mengembalikan jumlah baris yang berubah.
+    """
+    rows = Attendance.objects.filter(
+        date__gte=start, date__lte=end, check_in__isnull=False, status__in=['present', 'late'],
+    ).select_related('employee').only('status', 'late_minutes', 'date', 'check_in', 'employee__shift', 'employee__department')
+    changed = []
+    for attendance in rows.iterator(chunk_size=BATCH_SIZE):
+        status, late_minutes = evaluate(attendance.employee, attendance.date, attendance.check_in)
+        if (status, late_minutes) != (attendance.status, attendance.late_minutes):
+            attendance.status, attendance.late_minutes = status, late_minutes
+            changed.append(attendance)
+    with transaction.atomic():
+        Attendance.objects.bulk_update(changed, ['status', 'late_minutes'], batch_size=BATCH_SIZE)
+    if changed:
+        rollups.rebuild(start, end)
+    return len(changed)
@@ -0,0 +1,177 @@
+"""
+Pencarian teks penuh untuk karyawan (nama, username, ID, jabatan, departemen, telepon) dan
+alasan izin. Dokumen disimpan di tabel pendamping per baris: FTS5 di SQLite, tsvector + indeks
+GIN di PostgreSQL. Tabel diperbarui lewat signal (lihat signals.py); perubahan massal yang
+melewati signal bisa disusul dengan perintah rebuild_search_index.
+"""
+import re
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Employee, LeaveRequest
+
+TABLES = {
+    'employee': 'employees_employee_search',
+    'leave': 'employees_leaverequest_search',
+}
+
+# Backend lain tidak punya indeks teks penuh bawaan; pakai icontains seperti sebelumnya
+FALLBACK_FIELDS = {
+    'employee': ['user__first_name', 'user__last_name', 'user__username', 'employee_id', 'phone', 'position', 'department'],
+    'leave': ['employee__user__first_name', 'employee__user__last_name', 'employee__employee_id', 'reason'],
+}
+
+
+def is_supported():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def create_tables(conn=connection):
+    with conn.cursor() as cursor:
+        for table in TABLES.values():
+            name = conn.ops.quote_name(table)
+            if conn.vendor == 'sqlite':
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} "
+                    f"USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            elif conn.vendor == 'postgresql':
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} (id bigint PRIMARY KEY, document tsvector NOT NULL)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {conn.ops.quote_name(table + '_gin')} ON {name} USING gin (document)")
+
+
+def drop_tables(conn=connection):
+    if conn.vendor not in ('sqlite', 'postgresql'):
+        return
+    with conn.cursor() as cursor:
+        for table in TABLES.values():
+            cursor.execute(f"DROP TABLE IF EXISTS {conn.ops.quote_name(table)}")
+
+
+def _document_source(kind):
+    # (kolom id, ekspresi teks dokumen, klausa FROM); pemanggil menambahkan WHERE sendiri
+    qn = connection.ops.quote_name
+    employee = qn(Employee._meta.db_table)
+    user = qn(User._meta.db_table)
+    names = [f"u.{qn(c)}" for c in ('first_name', 'last_name')]
+    if kind == 'employee':
+        columns = names + [f"u.{qn('username')}"] + [f"e.{qn(c)}" for c in ('employee_id', 'position', 'department', 'phone')]
+        source = f"FROM {employee} e JOIN {user} u ON u.{qn('id')} = e.{qn('user_id')}"
+        return f"e.{qn('id')}", " || ' ' || ".join(columns), source
+    columns = names + [f"e.{qn('employee_id')}", f"l.{qn('reason')}"]
+    source = (
+        f"FROM {qn(LeaveRequest._meta.db_table)} l "
+        f"JOIN {employee} e ON e.{qn('id')} = l.{qn('employee_id')} "
+        f"JOIN {user} u ON u.{qn('id')} = e.{qn('user_id')}"
+    )
+    return f"l.{qn('id')}", " || ' ' || ".join(columns), source
+
+
+def _reindex(kind, where='', params=()):
+    """Tulis ulang dokumen `kind` untuk baris yang cocok dengan `where` (alias e/l/u)."""
+    if not is_supported():
+        return
+    table = connection.ops.quote_name(TABLES[kind])
+    pk, text, source = _document_source(kind)
+    source += f" WHERE {where or '1 = 1'}"
+    if connection.vendor == 'sqlite':
+        # FTS5 menerima REPLACE berdasarkan rowid
+        insert = f"INSERT OR REPLACE INTO {table} (rowid, document) SELECT {pk}, {text} {source}"
+    else:
+        insert = (
+            f"INSERT INTO {table} (id, document) SELECT {pk}, to_tsvector('simple', {text}) {source} "
+            f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document"
+        )
+    if where:
+        with connection.cursor() as cursor:
+            cursor.execute(insert, params)
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(insert)
+
+
+def _remove(kind, ids):
+    if not is_supported() or not ids:
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'id'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(TABLES[kind])} WHERE {key} IN ({', '.join(['%s'] * len(ids))})",
+            list(ids),
+        )
+
+
+def index_employees(ids):
+    ids = list(ids)
+    if ids:
+        placeholders = ', '.join(['%s'] * len(ids))
+        _reindex('employee', f"e.id IN ({placeholders})", ids)
+        _reindex('leave', f"l.employee_id IN ({placeholders})", ids)
+
+
+def index_users(ids):
+    # Nama diambil dari User, jadi dokumen karyawan dan izinnya ikut diperbarui
+    ids = list(ids)
+    if ids:
+        placeholders = ', '.join(['%s'] * len(ids))
+        _reindex('employee', f"e.user_id IN ({placeholders})", ids)
+        _reindex('leave', f"e.user_id IN ({placeholders})", ids)
+
+
+def index_leaves(ids):
+    ids = list(ids)
+    if ids:
+        _reindex('leave', f"l.id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def remove_employees(ids):
+    _remove('employee', ids)
+
+
+def remove_leaves(ids):
+    _remove('leave', ids)
+
+
+def rebuild():
+    """Bangun ulang seluruh indeks dari tabel sumber. Mengembalikan jumlah dokumen per jenis."""
+    for kind in TABLES:
+        _reindex(kind)
+    return {'employee': Employee.objects.count(), 'leave': LeaveRequest.objects.count()}
+
+
+def terms(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def _match_sql(kind, words):
+    table = connection.ops.quote_name(TABLES[kind])
+    if connection.vendor == 'sqlite':
+        # Setiap kata dicari sebagai awalan: "budi"* "it"*
+        return f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [' '.join(f'"{w}"*' for w in words)]
+    return f"SELECT id FROM {table} WHERE document @@ to_tsquery('simple', %s)", [' & '.join(f'{w}:*' for w in words)]
+
+
+def filter_queryset(queryset, kind, text):
+    """Saring queryset Employee/LeaveRequest dengan kata kunci; semua kata harus cocok (awalan)."""
+    words = terms(text)
+    if not words:
+        return queryset if not text.strip() else queryset.none()
+    if not is_supported():
+        for word in words:
+            condition = Q()
+            for field in FALLBACK_FIELDS[kind]:
+                condition |= Q(**{f'{field}__icontains': word})
+            queryset = queryset.filter(condition)
+        return queryset
+    sql, params = _match_sql(kind, words)
+    return queryset.filter(pk__in=RawSQL(sql, params))
+
+
+def search_employees(queryset, text):
+    return filter_queryset(queryset, 'employee', text)
+
+
+def search_leaves(queryset, text):
+    return filter_queryset(queryset, 'leave', text)
@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from . import images, leaves, rollups, schedules, search
+from .cache import bump_version, clear_departments, clear_identity, month_version
+from .models import Developer, Employee, Attendance, ArchivedAttendance, Holiday, LeaveBalance, LeaveRequest, Salary, Shift
+
+VERSIONED_SENDERS = {
+    Employee: 'employee',
+    Attendance: 'attendance',
+    LeaveRequest: 'leave',
+    LeaveBalance: 'leave',
+    Salary: 'salary',
+}
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def clear_department_cache(sender, **kwargs):
+    clear_departments()
+
+
+@receiver(post_save, sender=Employee)
+def generate_employee_photo_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.schedule_variants(instance, 'photo', 'photo_variants')
+
+
+@receiver(post_save, sender=Developer)
+def generate_developer_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.schedule_variants(instance, 'image', 'image_variants')
+
+
+@receiver(pre_save, sender=Attendance)
+def stamp_attendance_lateness(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedules.stamp(instance)
+
+
+@receiver([post_save, post_delete], sender=Shift)
+@receiver([post_save, post_delete], sender=Holiday)
+def clear_schedule_cache(sender, **kwargs):
+    schedules.clear_schedule()
+
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_rollup(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rollups.record_save(instance)
+
+
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=ArchivedAttendance)
+def remove_attendance_rollup(sender, instance, **kwargs):
+    rollups.record_delete(instance)
+
+
+@receiver(post_save, sender=LeaveRequest)
+def update_leave_balance(sender, instance, raw=False, **kwargs):
+    if not raw:
+        leaves.record_leave_change(getattr(instance, '_ledger_key', None), instance.ledger_key())
+        instance._ledger_key = instance.ledger_key()
+
+
+@receiver(post_delete, sender=LeaveRequest)
+def remove_leave_balance(sender, instance, **kwargs):
+    leaves.record_leave_change(getattr(instance, '_ledger_key', None) or instance.ledger_key(), None)
+
+
+def bump_data_version(sender, **kwargs):
+    bump_version(VERSIONED_SENDERS[sender])
+
+
+for model in VERSIONED_SENDERS:
+    post_save.connect(bump_data_version, sender=model, dispatch_uid=f'bump_version_{model.__name__}')
+    post_delete.connect(bump_data_version, sender=model, dispatch_uid=f'delete_bump_version_{model.__name__}')
+
+
+@receiver([post_save, post_delete], sender=Salary)
+def bump_salary_month_version(sender, instance, **kwargs):
+    # Cache analitik payroll disimpan per bulan (lihat analytics.py)
+    for month in {instance.month, getattr(instance, '_month', None)} - {None}:
+        bump_version(month_version('salary', month))
+
+
+@receiver([post_save, post_delete], sender=User)
+def bump_employee_version_on_user_change(sender, update_fields=None, **kwargs):
+    # Nama karyawan diambil dari User; update last_login saat login tidak perlu membatalkan cache
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_version('employee')
+
+
+@receiver([post_save, post_delete], sender=User)
+def clear_user_identity(sender, instance, **kwargs):
+    clear_identity(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def clear_employee_identity(sender, instance, **kwargs):
+    clear_identity(instance.user_id)
+
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_employees([instance.pk])
+
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, **kwargs):
+    search.remove_employees([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def index_user_names(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or set(update_fields) != {'last_login'}):
+        search.index_users([instance.pk])
+
+
+@receiver(post_save, sender=LeaveRequest)
+def index_leave(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_leaves([instance.pk])
+
+
+@receiver(post_delete, sender=LeaveRequest)
+def unindex_leave(sender, instance, **kwargs):
+    search.remove_leaves([instance.pk])
@@ -0,0 +1,82 @@
+"""
+Tugas latar yang dijalankan oleh run_workers (lihat jobs.py). Argumen dan hasil harus bisa
+diserialisasi ke JSON, jadi tanggal dikirim sebagai string ISO dan objek sebagai id.
+"""
+import os
+import secrets
+import tempfile
+from datetime import date
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.mail import send_mail
+from . import exports, images
+from .jobs import task
+from .models import Employee, LeaveRequest
+from .payroll import run_payroll
+
+EXPORT_DIR = 'exports'
+
+
+@task('payroll.run')
+def payroll_run(job, month, employee_ids=None):
+    employees = Employee.objects.filter(pk__in=employee_ids) if employee_ids is not None else None
+    job.report(0, message=f'Menghitung payroll {month}')
+    return run_payroll(date.fromisoformat(month), employees=employees)
+
+
+@task('images.variants')
+def image_variants(job, model, pk, field_name, variants_field):
+    images.refresh_variants(apps.get_model(model), pk, field_name, variants_field)
+
+
+@task('exports.build')
+def build_export(job, dataset, start=None, end=None, format='csv'):
+    # Nama file memuat token acak agar tidak bisa ditebak; staf mengunduhnya lewat view job_download
+    start = date.fromisoformat(start) if start else None
+    end = date.fromisoformat(end) if end else None
+    total = exports.count_rows(dataset, start, end)
+    progress = lambda done: job.report(done, total, f'{done} dari {total} baris')  # noqa: E731
+    with tempfile.TemporaryFile() as output:
+        if format == 'xlsx':
+            exports.write_xlsx(dataset, output, start, end, progress=progress)
+        else:
+            for number, line in enumerate(exports.stream_csv(dataset, start, end)):
+                output.write(line.encode('utf-8'))
+                if number and number % exports.CHUNK_SIZE == 0:
+                    progress(number)
+        output.seek(0)
+        filename = f"{dataset}_{start or 'awal'}_{end or 'akhir'}.{format}"
+        name = default_storage.save(os.path.join(EXPORT_DIR, f'{secrets.token_hex(8)}-{filename}'), File(output))
+    return {'file': name, 'filename': filename, 'rows': total}
+
+
+@task('notify.leave_decision')
+def notify_leave_decision(job, leave_id):
+    leave = LeaveRequest.objects.select_related('employee__user').filter(pk=leave_id).first()
+    if leave is None or not leave.employee.user.email:
+        return {'sent': 0}
+    sent = send_mail(
+        f'Permohonan izin {leave.get_status_display().lower()}',
+        f'Halo {leave.employee.full_name},\n\n'
+        f'Permohonan {leave.get_leave_type_display()} tanggal {leave.start_date:%d/%m/%Y} - {leave.end_date:%d/%m/%Y} '
+        f'telah {leave.get_status_display().lower()}.\n{leave.admin_notes}',
+        None,
+        [leave.employee.user.email],
+    )
+    return {'sent': sent}
+
+
+@task('notify.employee_welcome')
+def notify_employee_welcome(job, employee_id):
+    employee = Employee.objects.select_related('user').filter(pk=employee_id).first()
+    if employee is None or not employee.user.email:
+        return {'sent': 0}
+    sent = send_mail(
+        'Akun karyawan Anda telah dibuat',
+        f'Halo {employee.full_name},\n\nAkun Anda dengan ID karyawan {employee.employee_id} '
+        f'dan username {employee.user.username} sudah aktif.',
+        None,
+        [employee.user.email],
+    )
+    return {'sent': sent}
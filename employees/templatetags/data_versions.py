@@ -0,0 +1,14 @@
+from django import template
+from employees.cache import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def data_version(*names):
+    """
+    {% data_version 'employee' 'attendance' as version %}
+    {% cache 3600 nama_fragmen version %}...{% endcache %}
+    Versi data gabungan untuk kunci {% cache %}; berubah setiap kali model terkait ditulis.
+    """
+    return '.'.join(str(version) for version in get_versions(*names))
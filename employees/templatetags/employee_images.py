@@ -0,0 +1,20 @@
+from django import template
+from django.utils.html import format_html
+from employees.images import variant_srcset, variant_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field_file, variants, size, alt='', css_class='', style=''):
+    """
+    {% responsive_image emp.photo emp.photo_variants 120 alt=emp.full_name css_class="profile-img" %}
+    Menghasilkan <img> dengan varian WebP yang sesuai ukuran tampilan beserta srcset-nya.
+    """
+    srcset = variant_srcset(field_file, variants)
+    return format_html(
+        '<img src="{}"{} width="{}" height="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+        variant_url(field_file, variants, size),
+        format_html(' srcset="{}" sizes="{}px"', srcset, size) if srcset else '',
+        size, size, alt, css_class, style,
+    )
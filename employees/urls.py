@@ -1,16 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as dashboard_views
+else:
+    dashboard_views = views
+
 urlpatterns = [
-    path('dashboard/', views.employee_dashboard, name='employee_dashboard'),
+    path('dashboard/', dashboard_views.employee_dashboard, name='employee_dashboard'),
     path('attendance/', views.mark_attendance, name='mark_attendance'),
+    path('attendance/check/', views.attendance_check, name='attendance_check'),
     path('attendance/history/', views.attendance_history, name='attendance_history'),
     path('leave/', views.leave_request_view, name='leave_request'),
     
     # Admin URLs
-    path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin/dashboard/', dashboard_views.admin_dashboard, name='admin_dashboard'),
     path('admin/add-employee/', views.add_employee_view, name='add_employee'), # URL Baru
-    path('admin/employees/', views.employee_list, name='employee_list'),
+    path('admin/employees/', dashboard_views.employee_list, name='employee_list'),
+    path('admin/absences/', views.absence_calendar, name='absence_calendar'),
+    path('admin/reports/attendance/', views.attendance_report, name='attendance_report'),
+    path('admin/reports/payroll/', views.payroll_analytics, name='payroll_analytics'),
+    path('admin/reports/payroll.json', views.payroll_analytics_json, name='payroll_analytics_json'),
     path('admin/employee/<int:employee_id>/', views.employee_detail, name='employee_detail'),
     path('admin/leave/<int:leave_id>/<str:action>/', views.manage_leave, name='manage_leave'),
+    path('admin/export/<str:dataset>/', views.export_data, name='export_data'),
+    path('admin/jobs/', views.job_list, name='job_list'),
+    path('admin/jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('admin/jobs/<int:job_id>/download/', views.job_download, name='job_download'),
 ]
\ No newline at end of file
@@ -1,12 +1,29 @@
+import json
+import tempfile
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Count, Sum, Q
-from .models import Employee, Attendance, LeaveRequest, Salary
+from django.utils.functional import SimpleLazyObject
+from datetime import timedelta
+from django.db import transaction
+from .models import Employee, Attendance, Job, LeaveRequest
 from .forms import LeaveRequestForm, AttendanceForm, EmployeeRegistrationForm, EmployeeProfileForm
 from django.contrib.auth import logout
+from . import analytics, archive, checkin, exports, jobs, leaves, rollups, schedules
+from .metrics import registry
+from .cache import get_departments
+from .dashboard import admin_dashboard_context
+from .pagination import keyset_page, parse_cursor
+from .search import search_employees
+
+EMPLOYEES_PER_PAGE = 24
+HISTORY_PER_PAGE = 30
 
 # --- VIEWS KARYAWAN (Hanya akses dashboard sendiri) ---
 
@@ -23,26 +40,28 @@ def employee_dashboard(request):
         logout(request) 
         return redirect('login') # Kembali ke login dengan pesan error
 
-    today = timezone.now().date()
-    current_month = timezone.now().replace(day=1).date()
-    
-    attendance_today = Attendance.objects.filter(employee=employee, date=today).first()
-    
-    # Statistik User
-    user_stats = Attendance.objects.filter(employee=employee, date__gte=current_month).aggregate(
-        present=Count('id', filter=Q(status='present')),
-        late=Count('id', filter=Q(status='late')),
-        absent=Count('id', filter=Q(status='absent')),
-    )
-    
+    queries = employee_dashboard_queries(employee)
     context = {
         'title': 'Dashboard Karyawan',
         'employee': employee,
-        'attendance_today': attendance_today,
-        'stats': user_stats,
+        'attendance_today': queries.pop('attendance_today')(),
+        # Statistik dan saldo hanya dihitung bila fragmen template-nya tidak ada di cache
+        **{name: SimpleLazyObject(query) for name, query in queries.items()},
     }
     return render(request, 'employees/employee_dashboard.html', context)
 
+def employee_dashboard_queries(employee):
+    # Tanggal lokal (Asia/Jakarta), sama dengan yang dipakai saat check-in
+    today = timezone.localdate()
+    current_month = today.replace(day=1)
+    return {
+        # Baris hari ini mengikuti tanggal shift (shift malam lewat tengah malam = baris kemarin)
+        'attendance_today': lambda: Attendance.objects.filter(employee=employee, date=schedules.attendance_date(employee)).first(),
+        # Statistik User (dibaca dari rekap bulanan, bukan agregasi ulang tabel Attendance)
+        'stats': lambda: rollups.employee_month_stats(employee, current_month),
+        'leave_balances': lambda: leaves.employee_balances(employee, today.year),
+    }
+
 # ... (Biarkan fungsi mark_attendance, attendance_history, leave_request_view tetap sama) ...
 # Copy fungsi attendance dan leave dari file lama Anda di sini
 @login_required
@@ -56,38 +75,112 @@ def mark_attendance(request):
     except Employee.DoesNotExist:
         return redirect('home')
 
-    today = timezone.now().date()
-    attendance = Attendance.objects.filter(employee=employee, date=today).first()
+    attendance = Attendance.objects.filter(employee=employee, date=schedules.attendance_date(employee)).first()
     
     if request.method == 'POST':
         form = AttendanceForm(request.POST, instance=attendance)
         if form.is_valid():
-            att = form.save(commit=False)
-            att.employee = employee
-            att.date = today
-            att.save()
-            messages.success(request, 'Kehadiran berhasil dicatat!')
+            # Jam masuk/keluar dicap oleh server lewat checkin.py
+            if attendance and attendance.check_in and not attendance.check_out:
+                checkin.check_out(employee)
+                messages.success(request, 'Check-out berhasil dicatat!')
+            else:
+                checkin.check_in(employee, location=form.cleaned_data['location'], notes=form.cleaned_data['notes'])
+                messages.success(request, 'Kehadiran berhasil dicatat!')
             return redirect('employee_dashboard')
     else:
         form = AttendanceForm(instance=attendance)
-    return render(request, 'employees/mark_attendance.html', {'form': form})
+    context = {
+        'title': 'Absensi',
+        'form': form,
+        'attendance_today': attendance,
+    }
+    return render(request, 'employees/mark_attendance.html', context)
+
+@login_required
+@require_POST
+def attendance_check(request):
+    """
+    Endpoint JSON ringan untuk check-in/check-out: POST {"action": "in"|"out", "location": "", "notes": ""}.
+    """
+    try:
+        employee = request.user.employee
+    except Employee.DoesNotExist:
+        return JsonResponse({'error': 'Akun belum terhubung data karyawan.'}, status=403)
+
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or '{}')
+        except ValueError:
+            return JsonResponse({'error': 'JSON tidak valid.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Body JSON harus berupa objek.'}, status=400)
+    else:
+        data = request.POST
+    action = data.get('action', 'in')
+
+    if action == 'in':
+        attendance, created = checkin.check_in(
+            employee,
+            location=str(data.get('location', ''))[:255],
+            notes=str(data.get('notes', '')),
+        )
+        return JsonResponse({
+            'created': created,
+            'date': attendance.date,
+            'check_in': attendance.check_in,
+            'check_out': attendance.check_out,
+            'status': attendance.status,
+        }, status=201 if created else 200)
+    if action == 'out':
+        check_out = checkin.check_out(employee)
+        if check_out is None:
+            return JsonResponse({'error': 'Belum check-in atau sudah check-out hari ini.'}, status=409)
+        return JsonResponse({'check_out': check_out})
+    return JsonResponse({'error': 'Aksi harus "in" atau "out".'}, status=400)
 
 @login_required
 def attendance_history(request):
     if request.user.is_staff: return redirect('admin_dashboard')
     try:
         employee = request.user.employee
-        history = Attendance.objects.filter(employee=employee).order_by('-date')
-    except:
-        history = []
-    return render(request, 'employees/attendance_history.html', {'history': history})
+    except Employee.DoesNotExist:
+        return render(request, 'employees/attendance_history.html', {'history': []})
+
+    # Filter bulan (YYYY-MM) dan status, diterjemahkan ke range tanggal agar tetap memakai index (employee, date)
+    # Riwayat dibaca dari tabel aktif dan arsip sekaligus (lihat archive.py)
+    filters = {'employee': employee}
+    month = request.GET.get('month', '')
+    status = request.GET.get('status', '')
+    month_start = parse_cursor(f'{month}-01') if month else None
+    if month_start:
+        filters.update(date__gte=month_start, date__lt=rollups.next_month(month_start))
+    if status in dict(Attendance.STATUS_CHOICES):
+        filters['status'] = status
+    history = archive.sources(**filters)
+
+    rows, newer, older = keyset_page(
+        history, 'date',
+        before=parse_cursor(request.GET.get('before')),
+        after=parse_cursor(request.GET.get('after')),
+        size=HISTORY_PER_PAGE,
+    )
+    context = {
+        'history': rows,
+        'newer_cursor': newer,
+        'older_cursor': older,
+        'status_choices': Attendance.STATUS_CHOICES,
+    }
+    return render(request, 'employees/attendance_history.html', context)
 
 @login_required
 def leave_request_view(request):
     if request.user.is_staff: return redirect('admin_dashboard')
-    employee = get_object_or_404(Employee, user=request.user)
+    employee = request.employee
+    if not employee:
+        raise Http404('Data karyawan tidak ditemukan.')
     if request.method == 'POST':
-        form = LeaveRequestForm(request.POST, request.FILES)
+        form = LeaveRequestForm(request.POST, request.FILES, employee=employee)
         if form.is_valid():
             leave = form.save(commit=False)
             leave.employee = employee
@@ -95,7 +188,7 @@ def leave_request_view(request):
             messages.success(request, 'Permohonan izin terkirim.')
             return redirect('employee_dashboard')
     else:
-        form = LeaveRequestForm()
+        form = LeaveRequestForm(employee=employee)
     return render(request, 'employees/leave_request.html', {'form': form})
 
 
@@ -103,30 +196,9 @@ def leave_request_view(request):
 
 @staff_member_required
 def admin_dashboard(request):
-    today = timezone.now().date()
-    current_month = timezone.now().replace(day=1).date()
-    
     # Poin 9: Tampilan Data Lengkap
-    context = {
-        'total_employees': Employee.objects.filter(is_active=True).count(),
-        'present_today': Attendance.objects.filter(date=today, status='present').count(),
-        'absent_today': Attendance.objects.filter(date=today, status='absent').count(), # Tambahan
-        'pending_leaves': LeaveRequest.objects.filter(status='pending').count(),
-        # List Karyawan Terbaru
-        'recent_employees': Employee.objects.all().order_by('-join_date')[:5],
-        # Absensi Terbaru
-        'recent_attendance': Attendance.objects.select_related('employee').order_by('-created_at')[:10],
-        # Izin Pending
-        'leave_requests': LeaveRequest.objects.filter(status='pending').select_related('employee'),
-        # Gaji
-        'total_salary': Salary.objects.filter(month=current_month).aggregate(total=Sum('total_salary'))['total'] or 0,
-        # Statistik Absensi Bulanan Global
-        'attendance_stats': Attendance.objects.filter(date__gte=current_month).aggregate(
-             present=Count('id', filter=Q(status='present')),
-             late=Count('id', filter=Q(status='late')),
-             absent=Count('id', filter=Q(status='absent')),
-        )
-    }
+    # Konteks di-cache per versi data; otomatis dibangun ulang saat Employee/Attendance/LeaveRequest/Salary berubah
+    context = {'title': 'Dashboard Admin', **admin_dashboard_context()}
     return render(request, 'employees/admin_dashboard.html', context)
 
 # Poin 8: Fitur Menambahkan Akun Karyawan (Hanya Admin)
@@ -149,6 +221,8 @@ def add_employee_view(request):
             employee.salary = request.POST.get('salary', 0)
             employee.join_date = request.POST.get('join_date', timezone.now().date())
             employee.save()
+            # Email sambutan dikirim worker, request tidak menunggu server SMTP
+            jobs.enqueue('notify.employee_welcome', user=request.user, employee_id=employee.pk)
             
             messages.success(request, f'Karyawan {user.get_full_name()} berhasil ditambahkan!')
             return redirect('admin_dashboard')
@@ -163,27 +237,203 @@ def add_employee_view(request):
     }
     return render(request, 'employees/add_employee.html', context)
 
+def employee_queryset(params):
+    # select_related('user') agar emp.full_name tidak memicu query per kartu
+    employees = Employee.objects.select_related('user').order_by('user__first_name', 'user__last_name', 'id')
+
+    search = params.get('search', '').strip()
+    department = params.get('department', '')
+    position = params.get('position', '').strip()
+    status = params.get('status', '')
+
+    if search:
+        employees = search_employees(employees, search)
+    if department:
+        employees = employees.filter(department=department)
+    if position:
+        employees = employees.filter(position=position)
+    if status == 'active':
+        employees = employees.filter(is_active=True)
+    elif status == 'inactive':
+        employees = employees.filter(is_active=False)
+    return employees
+
 @staff_member_required
 def employee_list(request):
-    employees = Employee.objects.all()
-    # Logika search dan filter seperti di template employee_list.html
-    return render(request, 'employees/employee_list.html', {'employees': employees})
+    employees = employee_queryset(request.GET)
+    page_obj = Paginator(employees, EMPLOYEES_PER_PAGE).get_page(request.GET.get('page'))
+
+    context = {
+        'title': 'Daftar Karyawan',
+        'employees': page_obj.object_list,
+        'page_obj': page_obj,
+        'departments': get_departments(),
+    }
+    return render(request, 'employees/employee_list.html', context)
+
+@staff_member_required
+def absence_calendar(request):
+    # Siapa yang izin bulan ini, per departemen
+    month = parse_cursor(f"{request.GET.get('month', '')}-01") or timezone.localdate().replace(day=1)
+    end = rollups.next_month(month) - timedelta(days=1)
+    department = request.GET.get('department', '')
+    statuses = ['approved', 'pending'] if request.GET.get('pending') else ['approved']
+
+    context = {
+        'title': 'Kalender Ketidakhadiran',
+        'month': month,
+        'department': department,
+        'departments': get_departments(),
+        'calendar': leaves.absence_calendar(month, end, department=department or None, statuses=statuses),
+    }
+    return render(request, 'employees/absence_calendar.html', context)
+
+@staff_member_required
+def attendance_report(request):
+    # Matriks kehadiran karyawan x tanggal per departemen; NumPy opsional seperti openpyxl pada ekspor
+    try:
+        from . import reports
+    except ImportError:
+        return HttpResponseBadRequest('Laporan matriks kehadiran membutuhkan library numpy.')
+
+    month = parse_cursor(f"{request.GET.get('month', '')}-01") or timezone.localdate().replace(day=1)
+    department = request.GET.get('department', '')
+    report = reports.attendance_matrix(month, department or None)
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="kehadiran_{month:%Y-%m}_{department or "semua"}.csv"'
+        reports.write_csv(report, response)
+        return response
+
+    context = {
+        'title': 'Matriks Kehadiran',
+        'report': report,
+        'rows': reports.matrix_rows(report),
+        'status_labels': [dict(Attendance.STATUS_CHOICES)[status] for status in report['statuses']],
+        'legend': [(reports.STATUS_CODES[status], label) for status, label in Attendance.STATUS_CHOICES],
+        'departments': get_departments(),
+    }
+    return render(request, 'employees/attendance_report.html', context)
+
+@staff_member_required
+def payroll_analytics(request):
+    month = parse_cursor(f"{request.GET.get('month', '')}-01") or timezone.localdate().replace(day=1)
+    report = analytics.payroll_analytics(month)
+    context = {
+        'title': 'Analitik Payroll',
+        'report': report,
+        'trend_rows': [
+            (entry, [entry['departments'].get(name) for name in report['department_names']])
+            for entry in report['trend']
+        ],
+    }
+    return render(request, 'employees/payroll_analytics.html', context)
+
+@staff_member_required
+def payroll_analytics_json(request):
+    month = parse_cursor(f"{request.GET.get('month', '')}-01") or timezone.localdate().replace(day=1)
+    # JsonResponse memakai DjangoJSONEncoder: Decimal menjadi string, tanggal menjadi ISO
+    return JsonResponse(analytics.payroll_analytics(month))
 
 @staff_member_required
 def employee_detail(request, employee_id):
-    employee = get_object_or_404(Employee, id=employee_id)
+    employee = get_object_or_404(Employee.objects.select_related('user'), id=employee_id)
     return render(request, 'employees/employee_detail.html', {'employee': employee})
 
 @staff_member_required
 def manage_leave(request, leave_id, action):
-    leave = get_object_or_404(LeaveRequest, id=leave_id)
-    if action == 'approve':
-        leave.status = 'approved'
-        messages.success(request, 'Izin disetujui.')
-    elif action == 'reject':
-        leave.status = 'rejected'
-        messages.warning(request, 'Izin ditolak.')
-        
-    leave.approved_by = request.user
-    leave.save()
-    return redirect('admin_dashboard')
\ No newline at end of file
+    # Status dan saldo cuti (lewat signal) diperbarui dalam satu transaksi
+    with transaction.atomic():
+        leave = get_object_or_404(LeaveRequest.objects.select_for_update(), id=leave_id)
+        if action == 'approve':
+            leaves.lock_balances(leave.employee, leave.leave_type, leave.start_date, leave.end_date)
+            over = leaves.exceeds_quota(leave.employee, leave.leave_type, leave.start_date, leave.end_date, exclude=leave)
+            if over:
+                year, remaining = over
+                messages.error(request, f'Izin tidak dapat disetujui: sisa jatah tahun {year} tinggal {max(remaining, 0)} hari.')
+                return redirect('admin_dashboard')
+            leave.status = 'approved'
+            messages.success(request, 'Izin disetujui.')
+        elif action == 'reject':
+            leave.status = 'rejected'
+            messages.warning(request, 'Izin ditolak.')
+            
+        leave.approved_by = request.user
+        leave.save()
+        jobs.enqueue('notify.leave_decision', user=request.user, leave_id=leave.pk)
+    return redirect('admin_dashboard')
+
+@staff_member_required
+def export_data(request, dataset):
+    exports.get_dataset(dataset)
+    start = parse_cursor(request.GET.get('start'))
+    end = parse_cursor(request.GET.get('end'))
+    filename = f"{dataset}_{start or 'awal'}_{end or 'akhir'}"
+
+    if request.GET.get('background'):
+        # Ekspor besar dibuat worker; hasilnya diunduh dari halaman status tugas
+        job = jobs.enqueue(
+            'exports.build', user=request.user, dataset=dataset, format=request.GET.get('format', 'csv'),
+            start=start and start.isoformat(), end=end and end.isoformat(),
+        )
+        messages.info(request, f'Ekspor {dataset} sedang diproses (tugas #{job.pk}).')
+        return redirect('job_list')
+
+    if request.GET.get('format') == 'xlsx':
+        try:
+            output = tempfile.TemporaryFile()
+            exports.write_xlsx(dataset, output, start, end)
+        except ImportError:
+            return HttpResponseBadRequest('Ekspor XLSX membutuhkan library openpyxl.')
+        output.seek(0)
+        return FileResponse(output, as_attachment=True, filename=f'{filename}.xlsx')
+
+    # CSV dikirim bertahap sehingga byte pertama langsung sampai ke klien
+    response = StreamingHttpResponse(exports.stream_csv(dataset, start, end), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+@staff_member_required
+def job_list(request):
+    job_qs = Job.objects.select_related('created_by').order_by('-created_at')
+    status = request.GET.get('status', '')
+    if status:
+        job_qs = job_qs.filter(status=status)
+    recent = list(job_qs[:50])
+    context = {
+        'title': 'Tugas Latar',
+        'jobs': recent,
+        'status': status,
+        'status_choices': Job.STATUS_CHOICES,
+        # Halaman dimuat ulang otomatis selama masih ada tugas yang berjalan
+        'refresh': any(job.is_active for job in recent),
+    }
+    return render(request, 'employees/job_list.html', context)
+
+@staff_member_required
+def job_status(request, job_id):
+    job = get_object_or_404(Job, id=job_id)
+    return JsonResponse({
+        'id': job.pk,
+        'name': job.name,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error if job.status == 'failed' else '',
+    })
+
+@staff_member_required
+def job_download(request, job_id):
+    job = get_object_or_404(Job, id=job_id, status='done')
+    name = (job.result or {}).get('file')
+    if not name or not default_storage.exists(name):
+        raise Http404('File hasil tugas tidak ditemukan.')
+    return FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=job.result.get('filename'))
+
+@staff_member_required
+def metrics(request):
+    # Histogram per view dari RequestMetricsMiddleware, format teks Prometheus
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -6,7 +6,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-your-secret-key-here-change-in-production'
 
-DEBUG = True
+# DJANGO_DEBUG=0 untuk produksi (mengaktifkan loader template ter-cache di bawah)
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = ['*']
 
@@ -22,11 +23,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Paling luar agar total waktu mencakup seluruh middleware lain
+    'employees.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'employees.middleware.IdentityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -35,7 +39,9 @@ ROOT_URLCONF = 'kendali_data_digital.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates yang juga mencatat waktu render untuk RequestMetricsMiddleware
+        'BACKEND': 'employees.metrics.InstrumentedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -50,13 +56,115 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'kendali_data_digital.wsgi.application'
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+ASGI_APPLICATION = 'kendali_data_digital.asgi.application'
+
+# ASYNC_VIEWS=1 memakai view async (employees/async_views.py) untuk dashboard dan daftar karyawan;
+# hanya bermanfaat saat dijalankan di server ASGI (uvicorn/daphne)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# Kehadiran yang lebih tua dari sekian bulan penuh dipindahkan ke tabel arsip (perintah archive_attendance)
+ATTENDANCE_HOT_MONTHS = int(os.environ.get('ATTENDANCE_HOT_MONTHS', 13))
+
+# Query SQL identik yang muncul sebanyak ini dalam satu request dilaporkan sebagai pola N+1
+REPEATED_QUERY_THRESHOLD = 5
+
+# Tugas latar (employees/jobs.py) dijalankan oleh perintah run_workers. JOBS_EAGER=1 menjalankannya
+# langsung di proses web setelah commit, untuk pengembangan tanpa worker.
+JOBS_EAGER = os.environ.get('JOBS_EAGER') == '1'
+
+# Notifikasi email dikirim oleh worker; default ditulis ke konsol
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'hrd@localhost')
+
+# Profil database dipilih lewat environment: DB_PROFILE=sqlite (default) atau postgres
+DB_PROFILE = os.environ.get('DB_PROFILE', 'sqlite')
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'kendali_data_digital'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Koneksi persisten dengan health check sebelum dipakai ulang
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL') == '1':
+        # Pool koneksi psycopg (butuh paket psycopg[pool]); tidak bisa digabung dengan CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX', 20)),
+            'timeout': 10,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Tunggu lock alih-alih langsung gagal "database is locked" saat jam absen ramai
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # Database test berbasis file agar uji konkurensi memakai koneksi terpisah per thread
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+    if os.environ.get('SQLITE_TUNING', '1') == '1':
+        # Dijalankan di setiap koneksi baru: WAL agar pembaca tidak memblokir penulis,
+        # synchronous=NORMAL (aman dengan WAL), mmap 256 MB dan cache halaman 64 MB
+        DATABASES['default']['OPTIONS']['init_command'] = (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA busy_timeout=20000;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA cache_size=-65536;'
+            'PRAGMA temp_store=MEMORY;'
+        )
+
+if not DEBUG:
+    # Template dikompilasi sekali per proses lalu disimpan di memori
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+# Cache bersama (Redis) diperlukan bila ada lebih dari satu proses worker, agar kenaikan
+# versi data (employees/cache.py) langsung membatalkan fragmen template di semua proses
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# User dan Employee dimuat dalam satu query; hasilnya di-cache sekian detik antar request (0 = mati).
+# Tanpa cache bersama (REDIS_URL) default-nya mati: LocMemCache per proses tidak ikut dibersihkan
+# saat user diubah lewat proses lain, sehingga identitas lama bisa terbaca
+AUTHENTICATION_BACKENDS = ['employees.backends.IdentityBackend']
+IDENTITY_CACHE_TIMEOUT = int(os.environ.get('IDENTITY_CACHE_TIMEOUT', 30 if os.environ.get('REDIS_URL') else 0))
+
+# Penyimpanan sesi: db (default), cached_db (baca dari cache, tulis ke keduanya) atau cache.
+# cached_db/cache hanya aman dengan cache bersama (REDIS_URL) bila worker lebih dari satu proses.
+SESSION_STORE = os.environ.get('SESSION_STORE', 'cached_db' if os.environ.get('REDIS_URL') else 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -1,3 +1,24 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from employees.tests import ViewBudgetMixin, create_employee
+from . import urls as main_urls
 
-# Create your tests here.
+
+class MainViewBudgetTests(ViewBudgetMixin, TestCase):
+    # (method, kwargs, data, role, maks query, maks ms)
+    budgets = {
+        'home': ('get', {}, {}, None, 0, 200),
+        'gallery': ('get', {}, {}, None, 1, 200),
+        'about': ('get', {}, {}, None, 0, 200),
+        'login': ('get', {}, {}, None, 0, 200),
+        'logout': ('get', {}, {}, 'employee', 4, 200),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username='admin', is_staff=True)
+        cls.employee = create_employee('budi')
+
+    def test_every_view_has_budget(self):
+        names = {pattern.name for pattern in main_urls.urlpatterns}
+        self.assertEqual(names - set(self.budgets), set(), 'View baru wajib punya anggaran query/latensi')